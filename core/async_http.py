@@ -0,0 +1,246 @@
+import os
+import ssl
+import json
+import time
+import zlib
+import asyncio
+import urllib.parse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from core.config import ConfigManager
+from core.http_client import get_client, USER_AGENT
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+class AsyncResponse:
+    """A finished response, with the same fields callers use on requests.Response."""
+
+    from_cache = False
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", "replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        pass
+
+class AsyncHttpClient:
+    """Minimal asyncio HTTP/1.1 GET client with keep-alive connection pools.
+
+    Runs on the FetchEngine loop and behaves like HttpClient.get: it shares
+    that client's response cache, per-host rate limiter, retry settings and
+    observers, so both paths are accounted for together. At most per_host
+    requests to one host are in flight; idle connections are reused.
+    Certificates are checked against the same CA bundle requests uses, and
+    URLs that the environment routes through a proxy are handed to the
+    blocking client (on the loop's thread pool), which speaks to proxies.
+    """
+
+    def __init__(self, client=None):
+        config = ConfigManager()
+        self.client = client or get_client()
+        self.per_host = config.get("async_fetch", "per_host", 16)
+        self.pool_size = config.get("http", "pool_size", 10)
+        self.max_redirects = 5
+        self._idle = {} # (scheme, host, port) -> [(reader, writer)]
+        self._limits = {} # host -> asyncio.Semaphore
+        self._proxied = {} # (scheme, netloc) -> whether the environment sets a proxy for it
+        self._ssl = None
+
+    async def get(self, url, params=None, headers=None, timeout=None, cache=True):
+        """GET url; raises requests.RequestException like the blocking client."""
+        loop = asyncio.get_running_loop()
+        if self._uses_proxy(url):
+            return await loop.run_in_executor(
+                None, lambda: self.client.get(url, params=params, headers=headers, timeout=timeout, cache=cache))
+
+        cache_store = self.client.cache if cache else None
+        if params:
+            query = urllib.parse.urlencode({k: v for k, v in params.items() if v is not None}, doseq=True)
+            full_url = url + ("&" if "?" in url else "?") + query
+        else:
+            full_url = url
+        if not cache_store:
+            return await self._fetch(full_url, headers, timeout)
+
+        # Same cache steps as HttpClient.get; SQLite blocks, so they run on the loop's thread pool
+        key, cached, headers = await loop.run_in_executor(
+            None, cache_store.before_request, url, params, headers)
+        if cached is not None and cached.fresh:
+            return cached
+        resp = await self._fetch(full_url, headers, timeout)
+        return await loop.run_in_executor(None, cache_store.after_request, key, cached, resp)
+
+    def _uses_proxy(self, url):
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        proxied = self._proxied.get(key)
+        if proxied is None:
+            proxied = self._proxied[key] = bool(requests.utils.get_environ_proxies(url))
+        return proxied
+
+    async def _fetch(self, url, headers, timeout):
+        # Follows redirects; each hop is rate limited against its own host
+        for _ in range(self.max_redirects + 1):
+            resp = await self._fetch_once(url, headers, timeout)
+            location = resp.headers.get("Location")
+            if resp.status_code not in REDIRECT_STATUSES or not location:
+                return resp
+            url = urllib.parse.urljoin(url, location)
+        raise requests.TooManyRedirects(f"Too many redirects: {url}")
+
+    async def _fetch_once(self, url, headers, timeout):
+        client = self.client
+        host = urllib.parse.urlsplit(url).netloc
+        attempt = 0
+        while True:
+            try:
+                # Slot first, then the rate-limit token, so a queue of waiting
+                # lookups can't bank tokens and then fire back to back
+                async with self._limit(host):
+                    await asyncio.sleep(client.limiter.reserve(host))
+                    started = time.monotonic()
+                    resp = await self._request(url, headers, timeout or client.timeout)
+            except (OSError, EOFError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                client.notify_observers(host, None, time.monotonic() - started)
+                delay = client.retry_delay(host, attempt)
+                if delay is None:
+                    raise requests.ConnectionError(f"{url}: {e!r}")
+            else:
+                client.notify_observers(host, resp.status_code, time.monotonic() - started)
+                delay = client.retry_delay(host, attempt, resp)
+                if delay is None:
+                    return resp
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _limit(self, host):
+        limit = self._limits.get(host)
+        if limit is None:
+            limit = self._limits[host] = asyncio.Semaphore(self.per_host)
+        return limit
+
+    async def _request(self, url, headers, timeout):
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        parts = urllib.parse.urlsplit(url)
+        https = parts.scheme == "https"
+        port = parts.port or (443 if https else 80)
+        pool_key = (parts.scheme, parts.hostname, port)
+
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        lines = [f"GET {target} HTTP/1.1", f"Host: {parts.netloc}",
+                 f"User-Agent: {USER_AGENT}", "Accept-Encoding: gzip, deflate",
+                 "Accept: */*", "Connection: keep-alive"]
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        while True:
+            conn = self._take_idle(pool_key)
+            reused = conn is not None
+            if conn is None:
+                if https and self._ssl is None:
+                    # The bundle requests would use (REQUESTS_CA_BUNDLE, else certifi's)
+                    cafile = (os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE")
+                              or requests.certs.where())
+                    self._ssl = ssl.create_default_context(cafile=cafile)
+                conn = await asyncio.wait_for(
+                    asyncio.open_connection(parts.hostname, port, ssl=self._ssl if https else None),
+                    connect_timeout)
+            reader, writer = conn
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, resp_headers, body, keep_alive = await asyncio.wait_for(
+                    self._read_response(reader), read_timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    continue # The server dropped an idle connection; open a fresh one
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive and len(self._idle.get(pool_key, ())) < self.pool_size:
+                self._idle.setdefault(pool_key, []).append(conn)
+            else:
+                writer.close()
+            return AsyncResponse(url, status, resp_headers, body)
+
+    def _take_idle(self, pool_key):
+        idle = self._idle.get(pool_key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+        return None
+
+    async def _read_response(self, reader):
+        line = await reader.readline()
+        if not line:
+            raise asyncio.IncompleteReadError(b"", None)
+        version, status, *_ = line.decode("latin-1").split(" ", 2)
+        status = int(status)
+
+        headers = CaseInsensitiveDict()
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip(), value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+        keep_alive = version == "HTTP/1.1" and "close" not in headers.get("Connection", "").lower()
+        if status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "chunked" in headers.get("Transfer-Encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Trailers, up to the blank line
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "Content-Length" in headers:
+            body = await reader.readexactly(int(headers["Content-Length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        encoding = headers.get("Content-Encoding", "").lower()
+        if encoding == "gzip":
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            try:
+                body = zlib.decompress(body)
+            except zlib.error:
+                body = zlib.decompress(body, -zlib.MAX_WBITS)
+        return status, headers, body, keep_alive
+
+    def close(self):
+        for conns in self._idle.values():
+            for _, writer in conns:
+                writer.close()
+        self._idle.clear()
@@ -1,96 +1,255 @@
 import os
+import re
+import mmap
+import weakref
+import threading
 import mutagen
-from mutagen.easyid3 import EasyID3
+from mutagen.id3 import ID3, Frames, USLT
+from mutagen.mp4 import MP4Tags
+
+from core.config import ConfigManager
+from core.imagesize import get_image_size
+
+# Raw tag keys for the fields EasyID3/EasyMP4 used to map for us, so a file
+# can be read (and written) with a single mutagen.File() call.
+ID3_FRAMES = {
+    "title": "TIT2",
+    "artist": "TPE1",
+    "album": "TALB",
+    "albumartist": "TPE2",
+    "date": "TDRC",
+    "genre": "TCON",
+    "originaldate": "TDOR"
+}
+MP4_ATOMS = {
+    "title": "\xa9nam",
+    "artist": "\xa9ART",
+    "album": "\xa9alb",
+    "albumartist": "aART",
+    "date": "\xa9day",
+    "genre": "\xa9gen"
+}
+# Editor/table key -> easy field name
+TAG_FIELDS = {
+    "title": "title",
+    "artist": "artist",
+    "album": "album",
+    "albumartist": "albumartist",
+    "year": "date",
+    "genre": "genre"
+}
+
+# save_tags() results; both truthy so "if save_tags(...)" still means "no error"
+SAVED = "saved"
+UNCHANGED = "unchanged"
+
+SYNCED_RE = re.compile(r'\[\d{2}:\d{2}(?:\.\d{2,3})?\]')
+
+def _read_field(tags, field):
+    if tags is None: return ""
+    try:
+        if isinstance(tags, ID3):
+            frame = tags.get(ID3_FRAMES.get(field, ""))
+            if not frame: return ""
+            if frame.FrameID == "TCON":
+                # Resolves numeric ID3v1 genres like "(17)"
+                return frame.genres[0] if frame.genres else ""
+            return str(frame.text[0]) if frame.text else ""
+        if isinstance(tags, MP4Tags):
+            values = tags.get(MP4_ATOMS.get(field, ""))
+            return str(values[0]) if values else ""
+        # Vorbis comments (FLAC/OGG) use the easy names directly
+        values = tags.get(field)
+        return values[0] if values else ""
+    except (IndexError, KeyError, TypeError, ValueError):
+        return ""
+
+def _write_field(tags, field, value):
+    if isinstance(tags, ID3):
+        frame_id = ID3_FRAMES[field]
+        tags.delall(frame_id)
+        if value:
+            tags.add(Frames[frame_id](encoding=3, text=[value]))
+    elif isinstance(tags, MP4Tags):
+        atom = MP4_ATOMS[field]
+        if value:
+            tags[atom] = [value]
+        elif atom in tags:
+            del tags[atom]
+    else:
+        if value:
+            tags[field] = [value]
+        elif field in tags:
+            del tags[field]
+
+def _read_lyrics(tags):
+    if tags is None: return ""
+    try:
+        if isinstance(tags, ID3):
+            uslt = tags.getall('USLT')
+            if uslt: return str(uslt[0])
+            sylt = tags.getall('SYLT')
+            return _sylt_to_lrc(sylt[0]) if sylt else ""
+        if isinstance(tags, MP4Tags):
+            values = tags.get('\xa9lyr')
+        else:
+            values = tags.get('lyrics')
+        return str(values[0]) if values else ""
+    except (IndexError, KeyError, TypeError, ValueError):
+        return ""
+
+def _sylt_to_lrc(frame):
+    if frame.format != 2:
+        return "[Synced Lyrics Present]" # Timed in MPEG frames; no way to map to LRC here
+    lines = []
+    for text, ms in frame.text:
+        minutes, seconds = divmod(ms / 1000.0, 60)
+        lines.append(f"[{int(minutes):02d}:{seconds:05.2f}]{text}")
+    return "\n".join(lines)
+
+def _lyrics_status(tags):
+    # 0 = none, 1 = unsynced, 2 = synced
+    if isinstance(tags, ID3) and tags.getall('SYLT') and not tags.getall('USLT'):
+        return 2
+    text = _read_lyrics(tags)
+    if not text: return 0
+    return 2 if SYNCED_RE.search(text) else 1
+
+class _FileLock:
+    __slots__ = ("lock", "__weakref__")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.lock.release()
+
+# One lock per file while anyone holds it; entries vanish once unused
+_file_locks = weakref.WeakValueDictionary()
+_file_locks_guard = threading.Lock()
+
+def file_lock(path):
+    """Return the lock serializing writes to path (editor, batch edit, lyrics fetch)."""
+    key = os.path.normcase(os.path.abspath(path))
+    with _file_locks_guard:
+        lock = _file_locks.get(key)
+        if lock is None:
+            lock = _file_locks[key] = _FileLock()
+        return lock
+
+class MappedFile:
+    """Read-only file object over an mmap of the whole file.
+
+    mutagen only seeks to and reads the tag regions (ID3 header, FLAC
+    metadata blocks, MP4 moov atoms), so with MADV_RANDOM only those pages
+    are faulted in instead of readahead pulling in the audio stream.
+    """
+
+    def __init__(self, path):
+        self.name = path
+        with open(path, 'rb') as f:
+            # Raises ValueError for empty files; callers fall back to a plain open
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._map, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+            self._map.madvise(mmap.MADV_RANDOM)
+        self._size = len(self._map)
+        self._pos = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            end = self._size
+        else:
+            end = min(self._size, self._pos + size)
+        data = self._map[self._pos:end] if end > self._pos else b""
+        self._pos = max(self._pos, end)
+        return data
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._pos
+        elif whence == 2:
+            offset += self._size
+        if offset < 0:
+            raise OSError("negative seek position")
+        # Like a real file, seeking past the end is allowed and reads return b""
+        self._pos = offset
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 class AudioHandler:
+    def __init__(self, read_mode="file"):
+        config = ConfigManager()
+        # "mmap" maps files and lets mutagen fault in only the tag regions; "file" uses plain reads.
+        # Only parse-pool workers pass "mmap" (see ParseEngine).
+        self.read_mode = read_mode
+        # Room reserved whenever a tag outgrows its padding, so later edits fit in place
+        self.padding = config.get("write", "padding", 65536)
+        self._stats_lock = threading.Lock()
+        self.saves = 0
+        self.rewrites = 0 # Saves that had to move the audio data
+
+    def _open_tags(self, filepath):
+        if self.read_mode == "mmap":
+            try:
+                with MappedFile(filepath) as fileobj:
+                    return mutagen.File(fileobj)
+            except (ValueError, OSError):
+                pass # Empty file or mmap not supported here (e.g. some network mounts)
+        return mutagen.File(filepath)
+
     def get_tags(self, filepath):
         try:
-            audio = mutagen.File(filepath, easy=True)
-            if not audio:
+            # One open, one parse: easy fields are mapped from the raw frames below
+            audio = self._open_tags(filepath)
+            # FileType is falsy when it has no tags yet, so compare against None
+            if audio is None:
                 return {"filename": os.path.basename(filepath), "path": filepath}
-                
+            
+            raw = audio.tags
             tags = {
                 "filename": os.path.basename(filepath),
-                "title": audio.get("title", [""])[0],
-                "artist": audio.get("artist", [""])[0],
-                "album": audio.get("album", [""])[0],
-                "albumartist": audio.get("albumartist", [""])[0],
-                "year": audio.get("date", [""])[0],
-                "genre": audio.get("genre", [""])[0],
+                "title": _read_field(raw, "title"),
+                "artist": _read_field(raw, "artist"),
+                "album": _read_field(raw, "album"),
+                "albumartist": _read_field(raw, "albumartist"),
+                "year": _read_field(raw, "date"),
+                "genre": _read_field(raw, "genre"),
                 "path": filepath,
                 "cover_status": 0,
                 "lyrics_status": 0
             }
             
             # Fallback for year/date if empty
-            if not tags["year"] and "originaldate" in audio:
-                tags["year"] = audio.get("originaldate", [""])[0]
+            if not tags["year"]:
+                tags["year"] = _read_field(raw, "originaldate")
 
-            # --- Optimization: Single Open for Advanced Metadata (Cover, Lyrics, Duration) ---
             try:
-                audio_full = mutagen.File(filepath)
-                
                 # 1. Duration
-                if audio_full and audio_full.info:
-                    tags['duration'] = audio_full.info.length
+                if audio.info:
+                    tags['duration'] = audio.info.length
                 else:
                     tags['duration'] = 0
 
-                # 2. Cover Art
-                if filepath.lower().endswith('.mp3'):
-                    if hasattr(audio_full, 'tags'):
-                        for k in audio_full.tags.keys():
-                            if k.startswith('APIC'):
-                                pic = audio_full.tags[k]
-                                from PIL import Image
-                                import io
-                                try:
-                                    img = Image.open(io.BytesIO(pic.data))
-                                    if img.size == (500, 500):
-                                        tags['cover_status'] = 2
-                                    else:
-                                        tags['cover_status'] = 1
-                                except:
-                                    pass # Corrupt image data
-                                break
-                elif filepath.lower().endswith('.flac'):
-                    if audio_full.pictures:
-                        from PIL import Image
-                        import io
-                        try:
-                            img = Image.open(io.BytesIO(audio_full.pictures[0].data))
-                            if img.size == (500, 500):
-                                tags['cover_status'] = 2
-                            else:
-                                tags['cover_status'] = 1
-                        except:
-                            pass
-
-                # 3. Lyrics
-                lyrics_text = ""
-                if filepath.lower().endswith('.mp3'):
-                    for k in audio_full.tags.keys():
-                        if k.startswith('USLT'):
-                            lyrics_text = str(audio_full.tags[k])
-                            break
-                        elif k.startswith('SYLT'):
-                            lyrics_text = "[Synced Lyrics Present]" 
-                            tags['lyrics_status'] = 2
-                            break
-                elif filepath.lower().endswith('.flac'):
-                    if 'lyrics' in audio_full:
-                        lyrics_text = audio_full['lyrics'][0]
-                
-                if lyrics_text:
-                    tags['lyrics'] = lyrics_text
-                    # Check for timestamps if status not already set by SYLT
-                    if tags['lyrics_status'] == 0:
-                        import re
-                        # Look for [mm:ss.xx] or [mm:ss]
-                        if re.search(r'\[\d{2}:\d{2}(?:\.\d{2,3})?\]', lyrics_text):
-                            tags['lyrics_status'] = 2 # Synced
-                        else:
-                            tags['lyrics_status'] = 1 # Unsynced
+                # 2. Cover Art (dimensions come from the image header, no decode)
+                tags['cover_status'] = self._cover_status(audio)
+
+                # 3. Lyrics: status only, get_lyrics() loads the text when a track is shown
+                tags['lyrics_status'] = _lyrics_status(raw)
 
             except Exception as e:
                 print(f"Error reading advanced metadata for {filepath}: {e}")
@@ -100,50 +259,131 @@ class AudioHandler:
         except Exception:
             return {"filename": os.path.basename(filepath), "path": filepath}
 
+    def _cover_status(self, audio):
+        # 0 = missing, 1 = wrong size or unreadable, 2 = 500x500
+        raw = audio.tags
+        size = None
+        data = None
+        if isinstance(raw, ID3):
+            apic = raw.getall('APIC')
+            if not apic: return 0
+            data = apic[0].data
+            size = get_image_size(data)
+        elif isinstance(raw, MP4Tags):
+            covr = raw.get('covr')
+            if not covr: return 0
+            data = covr[0] # MP4Cover is a bytes subclass
+            size = get_image_size(data)
+        else:
+            pictures = getattr(audio, 'pictures', None)
+            if not pictures: return 0
+            pic = pictures[0]
+            data = pic.data
+            # FLAC stores the dimensions in the PICTURE block itself
+            if pic.width and pic.height:
+                size = (pic.width, pic.height)
+            else:
+                size = get_image_size(data)
+        
+        if size is None:
+            size = self._decoded_size(data)
+        if size is None:
+            return 1 # Artwork is there but unreadable; don't report it as missing
+        return 2 if tuple(size) == (500, 500) else 1
+
+    def _decoded_size(self, data):
+        # Formats the header probe doesn't know; PIL still only reads the header
+        from PIL import Image
+        import io
+        try:
+            return Image.open(io.BytesIO(data)).size
+        except Exception:
+            return None
+
     def save_tags(self, filepath, tags):
+        """Write the fields present in tags that differ from the file.
+
+        Keys missing from tags are left alone. Returns SAVED, UNCHANGED when
+        the file already matched (nothing is written), or False on error.
+        """
         try:
-            audio = mutagen.File(filepath, easy=True)
-            if not audio:
+            # One open; only frames whose value changes are rewritten
+            with file_lock(filepath):
                 audio = mutagen.File(filepath)
-                if not audio: return False
-                audio.add_tags()
+                if audio is None: return False
+                raw = audio.tags
             
-            audio["title"] = tags.get("title", "")
-            audio["artist"] = tags.get("artist", "")
-            audio["album"] = tags.get("album", "")
-            audio["albumartist"] = tags.get("albumartist", "")
-            audio["date"] = tags.get("year", "")
-            audio["genre"] = tags.get("genre", "")
+                changed = {}
+                for key, field in TAG_FIELDS.items():
+                    if key not in tags: continue
+                    value = tags.get(key) or ""
+                    current = _read_field(raw, field)
+                    if field == "date" and not current:
+                        current = _read_field(raw, "originaldate") # What get_tags showed as the year
+                    if value != current:
+                        changed[field] = value
             
-            audio.save()
+                # Lyrics (only touched when the caller provides them)
+                lyrics = None
+                if "lyrics" in tags:
+                    lyrics = tags.get("lyrics") or ""
+                    if lyrics.strip() == _read_lyrics(raw).strip():
+                        lyrics = None
             
-            # Handle Lyrics (Not easy ID3)
-            audio_full = mutagen.File(filepath)
-            lyrics = tags.get("lyrics", "")
+                if not changed and lyrics is None:
+                    return UNCHANGED
             
-            if filepath.lower().endswith('.mp3'):
-                from mutagen.id3 import USLT
-                if not audio_full.tags: audio_full.add_tags()
-                
-                if lyrics:
-                    # Remove existing USLT frames first to avoid duplicates
-                    to_del = [k for k in audio_full.tags.keys() if k.startswith('USLT')]
-                    for k in to_del: del audio_full.tags[k]
-                    
-                    audio_full.tags.add(USLT(encoding=3, lang='eng', desc='', text=lyrics))
-                else:
-                    to_del = [k for k in audio_full.tags.keys() if k.startswith('USLT')]
-                    for k in to_del: del audio_full.tags[k]
-                audio_full.save()
-            elif filepath.lower().endswith('.flac'):
-                audio_full['lyrics'] = lyrics
-                audio_full.save()
-                
-            return True
+                if raw is None:
+                    audio.add_tags()
+                    raw = audio.tags
+                for field, value in changed.items():
+                    _write_field(raw, field, value)
+            
+                if lyrics is not None:
+                    if isinstance(raw, ID3):
+                        # Remove existing USLT frames first to avoid duplicates
+                        raw.delall('USLT')
+                        if lyrics:
+                            raw.add(USLT(encoding=3, lang='eng', desc='', text=lyrics))
+                    elif isinstance(raw, MP4Tags):
+                        if lyrics:
+                            raw['\xa9lyr'] = [lyrics]
+                        elif '\xa9lyr' in raw:
+                            del raw['\xa9lyr']
+                    else:
+                        if lyrics:
+                            raw['lyrics'] = [lyrics]
+                        elif 'lyrics' in raw:
+                            del raw['lyrics']
+            
+                self._save(audio)
+                return SAVED
         except Exception as e:
             print(f"Save Error: {e}")
             return False
 
+    def _save(self, audio):
+        # mutagen asks how much padding to leave. Keeping the existing amount
+        # means the tag is rewritten in place; anything else resizes the
+        # file, so when a resize is unavoidable reserve room for next time.
+        rewrote = []
+        def padding(info):
+            if info.padding >= 0:
+                return info.padding
+            rewrote.append(True)
+            return self.padding
+        
+        audio.save(padding=padding)
+        with self._stats_lock:
+            self.saves += 1
+            if rewrote:
+                self.rewrites += 1
+
+    def write_stats(self):
+        """Return (saves, full rewrites) made through this handler."""
+        with self._stats_lock:
+            return self.saves, self.rewrites
+
     def get_cover(self, filepath):
         try:
             audio = mutagen.File(filepath)
@@ -182,68 +422,59 @@ class AudioHandler:
             # The caller defaults to image/jpeg.
             # Let's just use the data provided.
             
-            audio = mutagen.File(filepath)
-            if not audio: return False
+            with file_lock(filepath):
+                audio = mutagen.File(filepath)
+                if audio is None: return False
             
-            if filepath.lower().endswith('.mp3'):
-                from mutagen.id3 import APIC
-                if not audio.tags: audio.add_tags()
-                audio.tags.add(APIC(encoding=3, mime=mime_type, type=3, desc='Cover', data=image_data))
-            elif filepath.lower().endswith('.flac'):
-                from mutagen.flac import Picture
-                pic = Picture()
-                pic.type = 3
-                pic.mime = mime_type
-                pic.desc = 'Cover'
-                pic.data = image_data
-                audio.clear_pictures()
-                audio.add_picture(pic)
-            elif filepath.lower().endswith('.m4a'):
-                from mutagen.mp4 import MP4Cover
-                fmt = MP4Cover.FORMAT_JPEG if mime_type == 'image/jpeg' else MP4Cover.FORMAT_PNG
-                audio.tags['covr'] = [MP4Cover(image_data, imageformat=fmt)]
+                if filepath.lower().endswith('.mp3'):
+                    from mutagen.id3 import APIC
+                    if audio.tags is None: audio.add_tags()
+                    audio.tags.add(APIC(encoding=3, mime=mime_type, type=3, desc='Cover', data=image_data))
+                elif filepath.lower().endswith('.flac'):
+                    from mutagen.flac import Picture
+                    pic = Picture()
+                    pic.type = 3
+                    pic.mime = mime_type
+                    pic.desc = 'Cover'
+                    pic.data = image_data
+                    audio.clear_pictures()
+                    audio.add_picture(pic)
+                elif filepath.lower().endswith('.m4a'):
+                    from mutagen.mp4 import MP4Cover
+                    if audio.tags is None: audio.add_tags()
+                    fmt = MP4Cover.FORMAT_JPEG if mime_type == 'image/jpeg' else MP4Cover.FORMAT_PNG
+                    audio.tags['covr'] = [MP4Cover(image_data, imageformat=fmt)]
             
-            audio.save()
-            return True
+                self._save(audio)
+                return True
         except Exception:
             return False
 
     def get_lyrics(self, filepath):
         try:
-            audio = mutagen.File(filepath)
-            if not audio: return ""
-            
-            if filepath.lower().endswith('.mp3'):
-                if hasattr(audio, 'tags'):
-                    for key in audio.tags.keys():
-                        if key.startswith('USLT'):
-                            return audio.tags[key].text
-            elif filepath.lower().endswith('.m4a'):
-                if '\xa9lyr' in audio.tags:
-                    return audio.tags['\xa9lyr'][0]
-            elif filepath.lower().endswith('.flac'):
-                if 'lyrics' in audio:
-                    return audio['lyrics'][0]
-            
-            return ""
+            audio = self._open_tags(filepath)
+            if audio is None: return ""
+            return _read_lyrics(audio.tags)
         except Exception:
             return ""
 
     def save_lyrics(self, filepath, lyrics):
         try:
-            audio = mutagen.File(filepath)
-            if not audio: return False
+            with file_lock(filepath):
+                audio = mutagen.File(filepath)
+                if audio is None: return False
             
-            if filepath.lower().endswith('.mp3'):
-                from mutagen.id3 import USLT
-                if not audio.tags: audio.add_tags()
-                audio.tags.add(USLT(encoding=3, lang='eng', desc='', text=lyrics))
-            elif filepath.lower().endswith('.m4a'):
-                audio.tags['\xa9lyr'] = [lyrics]
-            elif filepath.lower().endswith('.flac'):
-                audio['lyrics'] = [lyrics]
+                if filepath.lower().endswith('.mp3'):
+                    from mutagen.id3 import USLT
+                    if audio.tags is None: audio.add_tags()
+                    audio.tags.add(USLT(encoding=3, lang='eng', desc='', text=lyrics))
+                elif filepath.lower().endswith('.m4a'):
+                    if audio.tags is None: audio.add_tags()
+                    audio.tags['\xa9lyr'] = [lyrics]
+                elif filepath.lower().endswith('.flac'):
+                    audio['lyrics'] = [lyrics]
             
-            audio.save()
-            return True
+                self._save(audio)
+                return True
         except Exception:
             return False
@@ -1,15 +1,35 @@
 import os
+import queue
+import asyncio
 import concurrent.futures
 import requests
 import time
+import urllib.parse
 from core.audio import AudioHandler
+from core.concurrency import AIMDController
+from core.config import ConfigManager
+from core.http_client import get_client
+
+# Answers that mean lrclib wants fewer requests from us
+OVERLOAD_STATUSES = {None, 429, 503}
 
 class BatchLyricsProcessor:
     def __init__(self):
         self.lrc_url = "https://lrclib.net/api"
-        self.headers = {'User-Agent': 'TagFix/1.0 (https://github.com/tagfix)'}
-        self.session = requests.Session()
+        self.http = get_client()
         self.audio_handler = AudioHandler()
+        self.controller = self._make_controller()
+        self._gate = None # asyncio.Condition, created on the engine loop
+
+    def _make_controller(self):
+        config = ConfigManager()
+        return AIMDController(
+            initial=config.get("batch_lyrics", "initial_workers", 4),
+            minimum=config.get("batch_lyrics", "min_workers", 1),
+            maximum=config.get("batch_lyrics", "max_workers", 16),
+            target_p95=config.get("batch_lyrics", "target_p95", 2.0),
+            max_error_rate=config.get("batch_lyrics", "max_error_rate", 0.1)
+        )
 
     def process_library(self, files, progress_callback=None, skip_existing=True, strict_mode=True, save_sidecar=True):
         # files is now a list of paths
@@ -17,105 +37,192 @@ class BatchLyricsProcessor:
         total = len(files)
         processed = 0
         
-        # 2. Process concurrently
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_file = {executor.submit(self._process_file, f, skip_existing, strict_mode, save_sidecar): f for f in files}
-            for future in concurrent.futures.as_completed(future_to_file):
-                f = future_to_file[future]
-                try:
-                    res = future.result()
-                    if progress_callback:
-                        processed += 1
-                        progress_callback(processed, total, f, res)
-                except Exception as e:
-                    print(f"Error processing {f}: {e}")
-
-    def _process_file(self, filepath, skip_existing, strict_mode, save_sidecar):
-        # A. Read Metadata
+        # The client reports each network attempt to lrclib (cache hits never get here):
+        # its own time, without our rate-limit waits or retry backoff, feeds the controller,
+        # and timeouts and 429s (even ones it retried) cut the limit
+        lrc_host = urllib.parse.urlsplit(self.lrc_url).netloc
+        def observe(host, status, seconds):
+            if host != lrc_host:
+                return
+            if status in OVERLOAD_STATUSES:
+                self.controller.overload()
+                self.controller.record(seconds, ok=False)
+            else:
+                self.controller.record(seconds, ok=status < 500)
+        self.http.add_observer(observe)
+        
+        from core.fetch_engine import async_enabled
         try:
-            tags = self.audio_handler.get_tags(filepath)
-            if not tags: return "Read Error"
+            if async_enabled():
+                self._process_async(files, progress_callback, skip_existing, strict_mode, save_sidecar)
+                return
             
-            # B. Check if needed (Skip if synced lyrics already exist)
-            if skip_existing:
-                has_embedded = tags.get('lyrics_status', 0) == 2 # 2 is Synced
-                # We ONLY check for embedded lyrics here. 
-                # Even if a sidecar exists, if embedded is missing, we want to fetch/embed.
-                
-                if has_embedded:
-                    return "Skipped (Synced)"
+            # 2. Process concurrently; the controller decides how many lookups are in flight
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.controller.maximum) as executor:
+                future_to_file = {executor.submit(self._process_file, f, skip_existing, strict_mode, save_sidecar): f for f in files}
+                for future in concurrent.futures.as_completed(future_to_file):
+                    f = future_to_file[future]
+                    try:
+                        res = future.result()
+                        if progress_callback:
+                            processed += 1
+                            progress_callback(processed, total, f, res)
+                    except Exception as e:
+                        print(f"Error processing {f}: {e}")
+        finally:
+            self.http.remove_observer(observe)
 
-            # C. Fetch
-            # Optimization: Use duration from tags (added in AudioHandler optimization)
-            duration = tags.get('duration', 0)
+    def _process_async(self, files, progress_callback, skip_existing, strict_mode, save_sidecar):
+        # Lookups run on the FetchEngine loop; results come back here through its queue
+        from core.fetch_engine import get_engine
+        self._gate = None
+        results, future = get_engine().map(
+            lambda f: self._process_file_async(f, skip_existing, strict_mode, save_sidecar), files)
+        
+        total = len(files)
+        processed = 0
+        finished = 0
+        while finished < total:
+            try:
+                f, res, error = results.get(timeout=0.2)
+            except queue.Empty:
+                if future.done() and results.empty():
+                    break
+                continue
+            finished += 1
+            if error is not None:
+                print(f"Error processing {f}: {error}")
+            elif progress_callback:
+                processed += 1
+                progress_callback(processed, total, f, res)
 
-            lyrics_data = self._fetch_lyrics(tags.get('artist'), tags.get('title'), tags.get('album'), duration)
-            
-            if not lyrics_data:
-                return "Not Found"
-            
-            synced_lyrics = lyrics_data.get('syncedLyrics')
-            plain_lyrics = lyrics_data.get('plainLyrics')
-            
-            final_lyrics = None
-            
-            if synced_lyrics:
-                final_lyrics = synced_lyrics
-            elif not strict_mode and plain_lyrics:
-                final_lyrics = plain_lyrics
-            else:
-                return "No Synced Lyrics"
+    def _process_file(self, filepath, skip_existing, strict_mode, save_sidecar):
+        try:
+            tags, status = self._prepare(filepath, skip_existing)
+            if status: return status
+            lyrics_data = self._fetch_lyrics(tags.get('artist'), tags.get('title'), tags.get('album'), tags.get('duration', 0))
+            return self._apply(filepath, lyrics_data, strict_mode, save_sidecar)
+        except Exception as e:
+            return f"Error: {str(e)}"
 
-            # D. Sidecar
-            if save_sidecar and synced_lyrics: # Only save sidecar if we have synced lyrics (usually)
-                lrc_path = os.path.splitext(filepath)[0] + ".lrc"
-                with open(lrc_path, 'w', encoding='utf-8') as f:
-                    f.write(synced_lyrics)
-            
-            # E. Embed
-            tags['lyrics'] = final_lyrics
-            self.audio_handler.save_tags(filepath, tags)
-            
-            return "Success"
-            
+    async def _process_file_async(self, filepath, skip_existing, strict_mode, save_sidecar):
+        # Tag reads and writes block, so they go to the loop's thread pool
+        loop = asyncio.get_running_loop()
+        try:
+            tags, status = await loop.run_in_executor(None, self._prepare, filepath, skip_existing)
+            if status: return status
+            lyrics_data = await self._fetch_lyrics_async(tags.get('artist'), tags.get('title'), tags.get('album'), tags.get('duration', 0))
+            return await loop.run_in_executor(None, self._apply, filepath, lyrics_data, strict_mode, save_sidecar)
         except Exception as e:
             return f"Error: {str(e)}"
 
+    def _prepare(self, filepath, skip_existing):
+        """Return (tags, None) for a file that needs lyrics, or (None, status)."""
+        # A. Read Metadata
+        tags = self.audio_handler.get_tags(filepath)
+        if not tags: return None, "Read Error"
+        
+        # B. Check if needed (Skip if synced lyrics already exist)
+        if skip_existing:
+            has_embedded = tags.get('lyrics_status', 0) == 2 # 2 is Synced
+            # We ONLY check for embedded lyrics here. 
+            # Even if a sidecar exists, if embedded is missing, we want to fetch/embed.
+            
+            if has_embedded:
+                return None, "Skipped (Synced)"
+        return tags, None
+
+    def _apply(self, filepath, lyrics_data, strict_mode, save_sidecar):
+        # C. Fetched (duration from the tags was part of the query)
+        if not lyrics_data:
+            return "Not Found"
+        
+        synced_lyrics = lyrics_data.get('syncedLyrics')
+        plain_lyrics = lyrics_data.get('plainLyrics')
+        
+        final_lyrics = None
+        
+        if synced_lyrics:
+            final_lyrics = synced_lyrics
+        elif not strict_mode and plain_lyrics:
+            final_lyrics = plain_lyrics
+        else:
+            return "No Synced Lyrics"
+
+        # D. Sidecar
+        if save_sidecar and synced_lyrics: # Only save sidecar if we have synced lyrics (usually)
+            lrc_path = os.path.splitext(filepath)[0] + ".lrc"
+            with open(lrc_path, 'w', encoding='utf-8') as f:
+                f.write(synced_lyrics)
+        
+        # E. Embed
+        self.audio_handler.save_tags(filepath, {"lyrics": final_lyrics})
+        
+        return "Success"
+
     def _fetch_lyrics(self, artist, title, album, duration):
         try:
-            params = {
-                'artist_name': artist,
-                'track_name': title,
-                'album_name': album,
-                'duration': duration
-            }
-            # Remove empty
-            params = {k: v for k, v in params.items() if v}
-            
+            params = self._lyrics_params(artist, title, album, duration)
             url = f"{self.lrc_url}/get"
-            try:
-                resp = self.session.get(url, params=params, headers=self.headers, timeout=10)
-            except requests.exceptions.RequestException:
-                return None
-
-            if resp.status_code == 200:
-                data = resp.json()
-                if self._validate_duration(data.get('duration'), duration):
-                    return data
+            with self.controller.slot():
+                try:
+                    resp = self.http.get(url, params=params)
+                except requests.exceptions.RequestException:
+                    return None
+            return self._accept(resp, duration)
             
-            # Fallback search if strict match fails or duration mismatch
-            # (User requirement: GET /api/get or /api/search)
-            # If GET failed (404) or validation failed, try search
-            if resp.status_code == 404 or (resp.status_code == 200 and not self._validate_duration(resp.json().get('duration'), duration)):
-                 # Search logic could go here, but /get is usually best for "Mass" to avoid false positives.
-                 # Let's stick to /get for high precision in mass mode, or maybe a very strict search.
-                 pass
-                 
+        except Exception:
             return None
+
+    async def _fetch_lyrics_async(self, artist, title, album, duration):
+        from core.fetch_engine import get_engine
+        if self._gate is None:
+            self._gate = asyncio.Condition() # Wakes lookups waiting for a controller slot
+        try:
+            params = self._lyrics_params(artist, title, album, duration)
+            url = f"{self.lrc_url}/get"
+            async with self._gate:
+                await self._gate.wait_for(self.controller.try_acquire)
+            try:
+                try:
+                    resp = await get_engine().http.get(url, params=params)
+                except requests.exceptions.RequestException:
+                    return None
+            finally:
+                self.controller.release()
+                async with self._gate:
+                    self._gate.notify_all()
+            return self._accept(resp, duration)
             
         except Exception:
             return None
 
+    def _lyrics_params(self, artist, title, album, duration):
+        params = {
+            'artist_name': artist,
+            'track_name': title,
+            'album_name': album,
+            'duration': duration
+        }
+        # Remove empty
+        return {k: v for k, v in params.items() if v}
+
+    def _accept(self, resp, duration):
+        if resp.status_code == 200:
+            data = resp.json()
+            if self._validate_duration(data.get('duration'), duration):
+                return data
+        
+        # Fallback search if strict match fails or duration mismatch
+        # (User requirement: GET /api/get or /api/search)
+        # If GET failed (404) or validation failed, try search
+        if resp.status_code == 404 or (resp.status_code == 200 and not self._validate_duration(resp.json().get('duration'), duration)):
+             # Search logic could go here, but /get is usually best for "Mass" to avoid false positives.
+             # Let's stick to /get for high precision in mass mode, or maybe a very strict search.
+             pass
+             
+        return None
+
     def _validate_duration(self, api_duration, local_duration):
         if not api_duration or not local_duration: return True # Cannot validate
         return abs(float(api_duration) - float(local_duration)) < 2.0
@@ -0,0 +1,98 @@
+import threading
+
+from core.config import ConfigManager
+
+class _WriteJob:
+    def __init__(self, paths, write):
+        self.paths = paths
+        self.write = write
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+        self.next = 0 # Index of the next path to hand out
+        self.done = 0
+        self.results = {} # path -> write() result
+        self.running = 0 # Worker threads still alive
+
+class BatchWriter:
+    """Runs write(path) over many files on a bounded pool of threads.
+
+    Each AudioHandler write takes that file's lock, so batch jobs, the
+    editor and the lyrics fetcher never write the same file at once.
+    schedule(ms, callback) runs callback on the Tk thread later (a
+    widget's after); on_progress(done, total) is called there at most
+    every progress_ms and on_done(results, cancelled) once every worker
+    has stopped. An owner that goes away mid-job should cancel() it.
+    Threads rather than processes, because mutagen spends most of a save
+    waiting on the disk and the per-file locks only work within a process.
+    """
+
+    def __init__(self, schedule, workers=None, progress_ms=100):
+        self.schedule = schedule
+        self.workers = workers or ConfigManager().get("write", "workers", 4)
+        self.progress_ms = progress_ms
+        self._job = None
+
+    def start(self, paths, write, on_progress=None, on_done=None):
+        if self._job:
+            self._job.cancelled.set()
+        job = _WriteJob(list(paths), write)
+        self._job = job
+
+        job.running = min(self.workers, len(job.paths)) or 1
+        for _ in range(job.running):
+            t = threading.Thread(target=self._run, args=(job,))
+            t.daemon = True
+            t.start()
+        self.schedule(self.progress_ms, lambda: self._poll(job, on_progress, on_done))
+        return job
+
+    def cancel(self):
+        """Stop handing out files; writes already in progress still finish.
+
+        The job stays tracked (is_running() is True) until its workers have
+        exited and on_done has been called.
+        """
+        if self._job:
+            self._job.cancelled.set()
+
+    def is_running(self):
+        # Cleared by _poll only once every worker has exited and on_done has run
+        return self._job is not None
+
+    def is_cancelling(self):
+        return self._job is not None and self._job.cancelled.is_set()
+
+    def _run(self, job):
+        try:
+            while not job.cancelled.is_set():
+                with job.lock:
+                    if job.next >= len(job.paths):
+                        break
+                    path = job.paths[job.next]
+                    job.next += 1
+                try:
+                    result = job.write(path)
+                except Exception as e:
+                    print(f"Batch write failed for {path}: {e}")
+                    result = False
+                with job.lock:
+                    job.results[path] = result
+                    job.done += 1
+        finally:
+            with job.lock:
+                job.running -= 1
+
+    # --- Tk thread ---
+
+    def _poll(self, job, on_progress, on_done):
+        with job.lock:
+            done, running = job.done, job.running
+        if on_progress:
+            on_progress(done, len(job.paths))
+        if running:
+            self.schedule(self.progress_ms, lambda: self._poll(job, on_progress, on_done))
+            return
+        if self._job is job:
+            self._job = None
+        if on_done:
+            on_done(job.results, job.cancelled.is_set())
@@ -0,0 +1,99 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+class AIMDController:
+    """Adaptive cap on in-flight requests (additive increase, multiplicative decrease).
+
+    Workers hold a slot() around each request and record() its latency.
+    After a limit's worth of healthy completions (p95 under target_p95,
+    error rate under max_error_rate) the limit grows by one; a slow p95
+    trims it by a quarter and overload() (timeouts, 429s) halves it.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, target_p95=2.0, max_error_rate=0.1, window=50):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.target_p95 = target_p95
+        self.max_error_rate = max_error_rate
+        self.inflight = 0
+        self._latencies = deque(maxlen=window)
+        self._errors = deque(maxlen=window) # True for each failed request
+        self._since_change = 0
+        self._completed = 0
+        self._last_cut = None # _completed at the last overload() cut
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+        try:
+            yield
+        finally:
+            self.release()
+
+    def try_acquire(self):
+        """Take a slot without blocking (for asyncio callers); False when at the limit."""
+        with self._cond:
+            if self.inflight >= int(self.limit):
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.inflight -= 1
+            self._cond.notify_all()
+
+    def record(self, latency, ok=True):
+        """Feed one completed request and adjust the limit."""
+        with self._cond:
+            self._latencies.append(latency)
+            self._errors.append(not ok)
+            self._since_change += 1
+            self._completed += 1
+            # Judge each limit only once it has seen a full "round" of requests
+            if self._since_change < int(self.limit):
+                return
+            p95 = self._p95()
+            error_rate = sum(self._errors) / len(self._errors)
+            if error_rate > self.max_error_rate:
+                self._decrease(0.5)
+            elif p95 > self.target_p95:
+                self._decrease(0.75)
+            elif self.limit < self.maximum:
+                self.limit += 1
+                self._since_change = 0
+                self._cond.notify_all()
+
+    def overload(self):
+        """The server pushed back (timeout, 429/503): halve the limit."""
+        with self._cond:
+            # One cut per round; the rest of that round's failures are the same event
+            if self._last_cut is None or self._completed - self._last_cut >= int(self.limit) // 2:
+                self._last_cut = self._completed
+                self._decrease(0.5)
+
+    def _decrease(self, factor):
+        # Caller holds the lock
+        self.limit = max(self.minimum, self.limit * factor)
+        self._since_change = 0
+        # Old samples describe the previous limit
+        self._latencies.clear()
+        self._errors.clear()
+
+    def _p95(self):
+        if not self._latencies: return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def describe(self):
+        """Short status for progress logs, e.g. "limit 6, p95 0.42s"."""
+        with self._cond:
+            p95 = self._p95()
+            latency = f"{p95:.2f}s" if p95 is not None else "-"
+            return f"limit {int(self.limit)}, p95 {latency}"
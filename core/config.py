@@ -29,6 +29,74 @@ class ConfigManager:
             "lyrics": {
                 "strict_mode": True,
                 "save_lrc": False
+            },
+            "batch_lyrics": {
+                "initial_workers": 4,
+                "min_workers": 1,
+                "max_workers": 16,
+                "target_p95": 2.0, # Seconds; slower lookups stop the limit growing
+                "max_error_rate": 0.1
+            },
+            "index": {
+                "enabled": True,
+                "path": "tagfix_index.db"
+            },
+            "scan": {
+                "workers": 0, # 0 = one per CPU core
+                "chunk_size": 64,
+                "use_processes": True,
+                "read_mode": "mmap" # or "file"; parse-pool workers only, the app itself always uses "file"
+            },
+            "table": {
+                "virtual": True, # Only materialize the rows in view
+                "overscan": 10
+            },
+            "http": {
+                "connect_timeout": 5.0,
+                "read_timeout": 15.0,
+                "retries": 3,
+                "backoff": 0.5, # Seconds, doubled per retry with jitter
+                "max_backoff": 30.0,
+                "pool_size": 10 # Keep-alive connections per host
+            },
+            "ratelimit": {
+                "enabled": True,
+                "default": {"rate": 5.0, "burst": 5}, # Requests per second, burst size
+                "hosts": {
+                    "musicbrainz.org": {"rate": 1.0, "burst": 1},
+                    "itunes.apple.com": {"rate": 0.33, "burst": 3}, # ~20 per minute
+                    "coverartarchive.org": {"rate": 5.0, "burst": 5},
+                    "lrclib.net": {"rate": 5.0, "burst": 5}
+                }
+            },
+            "async_fetch": {
+                "enabled": True, # Mass lyrics/cover lookups on one asyncio loop
+                "concurrency": 64, # Lookups in progress per batch
+                "per_host": 16 # Requests in flight to one host
+            },
+            "http_cache": {
+                "enabled": True,
+                "path": "tagfix_http_cache.db",
+                "ttl": 604800, # Seconds a found result is reused (7 days)
+                "negative_ttl": 86400, # Seconds a 404 is remembered
+                "max_mb": 256
+            },
+            "write": {
+                "padding": 65536, # Bytes reserved when a tag has to grow
+                "workers": 4 # Parallel batch writes
+            },
+            "editor": {
+                "prefetch_radius": 5 # Rows on each side of the selection to warm
+            },
+            "thumbnails": {
+                "cache_dir": "thumbnail_cache",
+                "memory_items": 128,
+                "max_files": 5000
+            },
+            "watcher": {
+                "enabled": True,
+                "debounce_ms": 750,
+                "poll_interval": 10.0 # Seconds, only used where inotify is unavailable
             }
         }
         self.config = self.load()
@@ -0,0 +1,103 @@
+import re
+import queue
+from collections import OrderedDict
+
+from core.metadata import MetadataHandler
+
+_SPACES_RE = re.compile(r'\s+')
+
+def _normalize(text):
+    return _SPACES_RE.sub(" ", (text or "").strip()).casefold()
+
+def album_key(record):
+    """Return the normalized (album artist, album) a track's cover belongs to, or None."""
+    artist = _normalize(record.albumartist or record.artist)
+    album = _normalize(record.album)
+    if not artist or not album:
+        return None
+    return artist, album
+
+def group_by_album(records):
+    """Group records by album_key, keeping first-seen order; tracks without one are dropped."""
+    groups = OrderedDict()
+    for record in records:
+        key = album_key(record)
+        if key is not None:
+            groups.setdefault(key, []).append(record)
+    return groups
+
+class AlbumCoverPipeline:
+    """Looks up and downloads one cover per album, then embeds it in every track.
+
+    Tracks of an album share the same artwork, so per-track fetching repeated
+    the same search and download once per track. With the async engine
+    enabled, album lookups run concurrently on the FetchEngine loop while
+    the calling thread embeds each cover as it arrives.
+    """
+
+    def __init__(self, audio_handler, metadata_handler=None):
+        self.audio_handler = audio_handler
+        self.metadata_handler = metadata_handler or MetadataHandler()
+
+    def run(self, records, progress=None, cancelled=None):
+        """Fetch and embed covers for records (called off the Tk thread).
+
+        progress(done_albums, total_albums) is called after each album;
+        cancelled is an optional threading.Event checked between albums.
+        Returns (modified_paths, albums_found, albums_total).
+        """
+        groups = group_by_album(records)
+        from core.fetch_engine import async_enabled
+        if async_enabled():
+            return self._run_async(groups, progress, cancelled)
+        
+        modified_paths = []
+        found = 0
+        for i, members in enumerate(groups.values()):
+            if cancelled is not None and cancelled.is_set():
+                break
+            # Query with the tags as written, not the normalized key
+            first = members[0]
+            data = self.metadata_handler.fetch_cover_bytes(first.albumartist or first.artist, first.album)
+            if data:
+                found += 1
+                for record in members:
+                    if self.audio_handler.set_cover(record.path, data):
+                        modified_paths.append(record.path)
+            if progress:
+                progress(i + 1, len(groups))
+        return modified_paths, found, len(groups)
+
+    def _run_async(self, groups, progress, cancelled):
+        from core.fetch_engine import get_engine
+        
+        async def lookup(members):
+            first = members[0]
+            return await self.metadata_handler.fetch_cover_bytes_async(first.albumartist or first.artist, first.album)
+        
+        results, future = get_engine().map(lookup, groups.values())
+        modified_paths = []
+        found = 0
+        done = 0
+        while done < len(groups):
+            if cancelled is not None and cancelled.is_set():
+                future.cancel()
+                break
+            try:
+                members, data, error = results.get(timeout=0.2)
+            except queue.Empty:
+                if future.done() and results.empty():
+                    break # The engine gave up (its error is on the future)
+                continue
+            done += 1
+            if error is not None:
+                print(f"Cover lookup failed for {members[0].album}: {error}")
+            elif data:
+                found += 1
+                # Embedding is disk work, so it happens here rather than on the loop
+                for record in members:
+                    if self.audio_handler.set_cover(record.path, data):
+                        modified_paths.append(record.path)
+            if progress:
+                progress(done, len(groups))
+        return modified_paths, found, len(groups)
@@ -0,0 +1,198 @@
+import os
+import queue
+import itertools
+import threading
+
+from core.scanner import SUPPORTED_EXTS
+
+# Queue priorities: folders the user opened jump ahead of look-ahead work
+USER = 0
+PREFETCH = 1
+
+class Listing:
+    """Subfolders and recursive audio counts of one folder, as of its mtime_ns."""
+
+    __slots__ = ("path", "mtime_ns", "subdirs", "audio_count", "stats")
+
+    def __init__(self, path, mtime_ns, subdirs, audio_count, stats=None):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.subdirs = subdirs # sorted list of (name, path)
+        self.audio_count = audio_count # audio files in this folder and below; None until counted
+        self.stats = stats # (tracks, missing_covers, missing_lyrics) from the index, recursive
+
+class FolderLister:
+    """Lists folders with os.scandir on background threads.
+
+    request() answers from the cache straight away when it can and always
+    revalidates in the background; fresh listings are handed to
+    on_listing(listing, prefetch) on the Tk thread via after(). Every
+    folder the user lists also queues its subfolders at a lower priority,
+    so the next level down is usually ready before it is expanded.
+    Folders the index knows nothing about get their audio files counted
+    by a walk of the subtree, delivered as a second on_listing() call.
+    """
+
+    def __init__(self, widget, on_listing, index=None, workers=2, poll_ms=30):
+        self.widget = widget
+        self.on_listing = on_listing
+        self.index = index
+        self.poll_ms = poll_ms
+        self._lock = threading.Lock()
+        self._cache = {} # path -> Listing
+        self._queued = {} # path -> best queued priority
+        self._active = 0 # paths being listed right now
+        self._generation = 0
+        self._seq = itertools.count() # FIFO order within a priority
+        self._work = queue.PriorityQueue()
+        self._results = queue.Queue()
+        self._polling = False
+
+        for _ in range(max(1, workers)):
+            t = threading.Thread(target=self._run)
+            t.daemon = True
+            t.start()
+
+    def request(self, path, prefetch=False):
+        """Queue path for listing; return the cached Listing (possibly stale) or None."""
+        with self._lock:
+            cached = self._cache.get(path)
+            self._enqueue(path, PREFETCH if prefetch else USER)
+        self._start_polling()
+        return cached
+
+    def cached(self, path):
+        with self._lock:
+            return self._cache.get(path)
+
+    def invalidate(self, path=None):
+        """Forget path's listing, or everything (and drop queued work) when path is None."""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+                self._queued.clear()
+                self._generation += 1
+            else:
+                self._cache.pop(path, None)
+
+    def _enqueue(self, path, priority):
+        # Caller holds the lock
+        if self._queued.get(path, PREFETCH + 1) <= priority:
+            return
+        self._queued[path] = priority
+        self._work.put((priority, next(self._seq), self._generation, path))
+
+    # --- Worker threads ---
+
+    def _run(self):
+        while True:
+            priority, _, generation, path = self._work.get()
+            with self._lock:
+                # Superseded by a higher-priority entry, or dropped by invalidate()
+                if generation != self._generation or self._queued.get(path) != priority:
+                    continue
+                del self._queued[path]
+                cached = self._cache.get(path)
+                self._active += 1
+
+            try:
+                listing = self._list(path, cached)
+                if listing is None:
+                    continue
+                with self._lock:
+                    if generation != self._generation:
+                        continue
+                    self._cache[path] = listing
+                    if priority == USER:
+                        for _, subpath in listing.subdirs:
+                            if subpath not in self._cache:
+                                self._enqueue(subpath, PREFETCH)
+                self._results.put((generation, listing, priority == PREFETCH))
+
+                if listing.audio_count is None and not (listing.stats and listing.stats[0]):
+                    count = self._count_tree(path, generation)
+                    if count is not None:
+                        listing.audio_count = count
+                        self._results.put((generation, listing, priority == PREFETCH))
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+    def _list(self, path, cached):
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        if cached and cached.mtime_ns == mtime_ns:
+            # Unchanged folder: only the index counts can have moved
+            subdirs, audio_count = cached.subdirs, cached.audio_count
+        else:
+            subdirs = []
+            audio_count = None # Counted over the whole subtree afterwards, if the index can't
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.name.startswith('.'): continue
+                        try:
+                            # DirEntry caches the type from readdir, so no extra stat per entry
+                            if entry.is_dir():
+                                subdirs.append((entry.name, entry.path))
+                        except OSError:
+                            continue
+            except OSError:
+                pass # Unreadable folder: list what we got, like an empty folder
+            subdirs.sort()
+
+        stats = None
+        if self.index:
+            try:
+                stats = self.index.folder_stats(path)
+            except Exception as e:
+                print(f"Folder stats failed for {path}: {e}")
+        return Listing(path, mtime_ns, subdirs, audio_count, stats)
+
+    def _count_tree(self, path, generation):
+        # Audio files in path and every folder below it; None if invalidate() ran meanwhile
+        count = 0
+        stack = [path]
+        while stack:
+            if generation != self._generation:
+                return None
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.name.startswith('.'): continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.name.lower().endswith(SUPPORTED_EXTS) and entry.is_file():
+                                count += 1
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return count
+
+    # --- Tk thread ---
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                generation, listing, prefetch = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self._generation and self.on_listing:
+                self.on_listing(listing, prefetch)
+
+        with self._lock:
+            busy = bool(self._queued) or self._active > 0
+        if busy or not self._results.empty():
+            self.widget.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
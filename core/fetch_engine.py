@@ -0,0 +1,74 @@
+import queue
+import asyncio
+import threading
+
+from core.config import ConfigManager
+
+class FetchEngine:
+    """One asyncio event loop on a background thread for mass network lookups.
+
+    Hundreds of lookups can wait on the network at once without a thread
+    each. Callers hand coroutines over with submit() or map() and collect
+    results from a queue.Queue on their own thread; blocking work (tag
+    reads and writes) stays off the loop.
+    """
+
+    def __init__(self):
+        self.concurrency = ConfigManager().get("async_fetch", "concurrency", 64)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="fetch-engine")
+        self._thread.daemon = True
+        self._thread.start()
+        self.http = self.submit(self._make_http()).result()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _make_http(self):
+        # Created on the loop thread, which owns its connections
+        from core.async_http import AsyncHttpClient
+        return AsyncHttpClient()
+
+    def submit(self, coro):
+        """Schedule coro on the engine loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def map(self, func, items, limit=None):
+        """Run the coroutine function func(item) for each item, at most limit at once.
+
+        Returns (results, future): results receives (item, result, error)
+        tuples as lookups finish, in completion order; cancelling future
+        cancels every lookup not yet done.
+        """
+        results = queue.Queue()
+        future = self.submit(self._map(func, list(items), results, limit or self.concurrency))
+        return results, future
+
+    async def _map(self, func, items, results, limit):
+        slots = asyncio.Semaphore(limit)
+
+        async def one(item):
+            async with slots:
+                try:
+                    results.put((item, await func(item), None))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    results.put((item, None, e))
+
+        await asyncio.gather(*(one(item) for item in items))
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the process-wide FetchEngine, starting its loop thread on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine()
+        return _engine
+
+def async_enabled():
+    return ConfigManager().get("async_fetch", "enabled", True)
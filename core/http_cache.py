@@ -0,0 +1,180 @@
+import json
+import time
+import sqlite3
+import threading
+import urllib.parse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from core.config import ConfigManager
+
+def cache_key(url, params=None):
+    """Normalize a GET request: encoded params merged into the URL, sorted, host lowercased."""
+    prepared = requests.Request("GET", url, params=params).prepare().url
+    parts = urllib.parse.urlsplit(prepared)
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+
+class CachedResponse:
+    """The parts of requests.Response that callers use, served from the cache."""
+
+    from_cache = True
+
+    def __init__(self, url, status_code, headers, content, expires_at):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.expires_at = expires_at
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", "replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def validators(self):
+        # Conditional request headers for revalidating a stale entry
+        headers = {}
+        if "ETag" in self.headers:
+            headers["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+    def close(self):
+        pass
+
+class ResponseCache:
+    """SQLite store of GET responses with TTLs, 404 caching and an LRU size cap.
+
+    200 responses live for ttl seconds and 404s ("not found" is an answer
+    too) for negative_ttl. Expired entries with an ETag or Last-Modified
+    are revalidated by the client instead of refetched. When the stored
+    bodies exceed max_mb the least recently used entries are dropped.
+    """
+
+    def __init__(self, db_path=None):
+        config = ConfigManager()
+        self.db_path = db_path or config.get("http_cache", "path", "tagfix_http_cache.db")
+        self.ttl = config.get("http_cache", "ttl", 7 * 86400)
+        self.negative_ttl = config.get("http_cache", "negative_ttl", 86400)
+        self.max_bytes = config.get("http_cache", "max_mb", 256) * 1024 * 1024
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_access ON responses (last_access)")
+            self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def before_request(self, url, params=None, headers=None):
+        """Cache side of a GET before it goes out; returns (key, cached, headers).
+
+        A fresh cached entry is the answer. Otherwise send the returned
+        headers (a stale entry adds its validators, so the server can
+        answer 304) and pass the live response to after_request().
+        """
+        key = cache_key(url, params)
+        cached = self.lookup(key)
+        if cached is not None and not cached.fresh:
+            validators = cached.validators()
+            if validators:
+                headers = dict(headers or {}, **validators)
+        return key, cached, headers
+
+    def after_request(self, key, cached, resp):
+        """Cache side of a GET once answered; returns the response to hand back."""
+        if resp.status_code == 304 and cached is not None:
+            self.refresh(key)
+            return cached
+        self.store(key, resp)
+        return resp
+
+    def lookup(self, key):
+        """Return the CachedResponse for key (possibly stale), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if not row: return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        status, headers, body, expires_at = row
+        return CachedResponse(key, status, json.loads(headers), bytes(body), expires_at)
+
+    def store(self, key, resp):
+        """Store a live response if it is cacheable; returns True if stored."""
+        if resp.status_code == 200:
+            ttl = self.ttl
+        elif resp.status_code == 404:
+            ttl = self.negative_ttl
+        else:
+            return False
+        if "no-store" in resp.headers.get("Cache-Control", ""):
+            return False
+
+        # Only what revalidation and callers need; content is stored decoded
+        headers = {k: v for k, v in resp.headers.items()
+                   if k.lower() in ("content-type", "etag", "last-modified")}
+        body = resp.content
+        now = time.time()
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, status, headers, body, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, resp.status_code, json.dumps(headers), body, len(body), now + ttl, now)
+            )
+            self._total += len(body) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+        return True
+
+    def refresh(self, key):
+        """Extend a revalidated (304) entry's lifetime."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT status FROM responses WHERE key = ?", (key,)).fetchone()
+            if not row: return
+            ttl = self.ttl if row[0] == 200 else self.negative_ttl
+            now = time.time()
+            self._conn.execute("UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?",
+                               (now + ttl, now, key))
+
+    def _evict(self):
+        # Caller holds the lock; trim to 90% so we don't evict on every insert
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((key,))
+            self._total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._total = 0
@@ -0,0 +1,158 @@
+import time
+import random
+import threading
+import email.utils
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core.config import ConfigManager
+from core.ratelimit import RateLimiter
+
+USER_AGENT = 'TagFix/1.0 (https://github.com/tagfix)'
+
+# Worth retrying: rate limited, or the server/proxy had a transient failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def retry_after(resp):
+    # Seconds from a Retry-After header (delta-seconds or HTTP date), or None
+    value = resp.headers.get("Retry-After")
+    if not value: return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class HttpClient:
+    """Pooled keep-alive HTTP client shared by every metadata lookup.
+
+    One requests.Session holds a urllib3 pool per host, so repeated calls
+    to iTunes, MusicBrainz, Cover Art Archive and lrclib reuse warm TCP/TLS
+    connections. Every request gets (connect, read) timeouts, and 5xx/429
+    responses or connection errors are retried with jittered exponential
+    backoff (honouring Retry-After). Responses are gzip/deflate encoded on
+    the wire and decoded by requests. With the response cache enabled, 200
+    and 404 answers are kept on disk and served locally until they expire.
+    Requests that do go out wait for their host's rate limit first.
+    """
+
+    def __init__(self):
+        config = ConfigManager()
+        self.timeout = (config.get("http", "connect_timeout", 5.0),
+                        config.get("http", "read_timeout", 15.0))
+        self.retries = config.get("http", "retries", 3)
+        self.backoff = config.get("http", "backoff", 0.5)
+        self.max_backoff = config.get("http", "max_backoff", 30.0)
+        pool_size = config.get("http", "pool_size", 10)
+
+        self.session = requests.Session()
+        # Retries are done here, not by urllib3, so they see status codes and Retry-After
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": "gzip, deflate"
+        })
+
+        self.limiter = RateLimiter()
+        self._observers = []
+        self.cache = None
+        if config.get("http_cache", "enabled", True):
+            try:
+                from core.http_cache import ResponseCache
+                self.cache = ResponseCache()
+            except Exception as e:
+                print(f"HTTP cache unavailable: {e}")
+
+    def get(self, url, params=None, headers=None, timeout=None, cache=True):
+        """GET url, from the cache when possible; raises requests.RequestException.
+
+        Cached answers come back as a CachedResponse (same status_code,
+        content, text and json() as a requests.Response).
+        """
+        if not (cache and self.cache):
+            return self._fetch(url, params, headers, timeout)
+
+        key, cached, headers = self.cache.before_request(url, params, headers)
+        if cached is not None and cached.fresh:
+            return cached
+        resp = self._fetch(url, params, headers, timeout)
+        return self.cache.after_request(key, cached, resp)
+
+    def add_observer(self, callback):
+        """Call callback(host, status, seconds) after every live attempt (status None on a network error)."""
+        self._observers.append(callback)
+
+    def remove_observer(self, callback):
+        if callback in self._observers:
+            self._observers.remove(callback)
+
+    def notify_observers(self, host, status, seconds):
+        for callback in list(self._observers):
+            try:
+                callback(host, status, seconds)
+            except Exception as e:
+                print(f"HTTP observer error: {e}")
+
+    def _fetch(self, url, params, headers, timeout):
+        # Live request, rate limited per host and retrying transient failures
+        host = urllib.parse.urlsplit(url).netloc
+        attempt = 0
+        while True:
+            self.limiter.wait(host)
+            started = time.monotonic()
+            try:
+                resp = self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self.notify_observers(host, None, time.monotonic() - started)
+                delay = self.retry_delay(host, attempt)
+                if delay is None:
+                    raise
+            else:
+                self.notify_observers(host, resp.status_code, time.monotonic() - started)
+                delay = self.retry_delay(host, attempt, resp)
+                if delay is None:
+                    return resp
+                resp.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def retry_delay(self, host, attempt, resp=None):
+        """Seconds to back off before retrying an attempt, or None if it is final.
+
+        resp is None after a network error. Only RETRY_STATUSES are retried;
+        a Retry-After sets the delay and holds back every request to host.
+        """
+        if attempt >= self.retries:
+            return None
+        wait = None
+        if resp is not None:
+            if resp.status_code not in RETRY_STATUSES:
+                return None
+            print(f"HTTP {resp.status_code} from {host}, retrying")
+            wait = retry_after(resp)
+            if wait is not None:
+                # The server said when it will take requests again, for every worker
+                self.limiter.pause(host, wait)
+        if wait is None:
+            # "Equal jitter": half fixed, half random, so parallel workers spread out
+            wait = self.backoff * (2 ** attempt)
+            wait = wait / 2 + random.uniform(0, wait / 2)
+        return min(wait, self.max_backoff)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Return the process-wide HttpClient."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
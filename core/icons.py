@@ -61,3 +61,28 @@ def create_status_icon(cover_status, lyrics_status, is_loading=False):
     draw.text((71, 1), "L", fill=l_text_color)
     
     return ImageTk.PhotoImage(img)
+
+
+# Flyweight registry: there are only 3x3 cover/lyrics states plus 3 loading
+# variants, so every row shares one of these PhotoImages.
+_icon_cache = {}
+
+def _icon_key(cover_status, lyrics_status, is_loading):
+    # The lyrics badge is blue while loading whatever its status, so those share an icon
+    return (cover_status, None if is_loading else lyrics_status, is_loading)
+
+def get_status_icon(cover_status, lyrics_status, is_loading=False):
+    if not _icon_cache:
+        # Pre-render every state on first use (needs a Tk root to exist)
+        for c in (0, 1, 2):
+            _icon_cache[_icon_key(c, None, True)] = create_status_icon(c, 0, is_loading=True)
+            for l in (0, 1, 2):
+                _icon_cache[_icon_key(c, l, False)] = create_status_icon(c, l)
+    
+    key = _icon_key(cover_status, lyrics_status, is_loading)
+    icon = _icon_cache.get(key)
+    if icon is None:
+        # Unexpected status value; render once and keep it
+        icon = create_status_icon(cover_status, lyrics_status, is_loading)
+        _icon_cache[key] = icon
+    return icon
@@ -0,0 +1,68 @@
+import struct
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) share the range but don't
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def get_image_size(data):
+    """Return (width, height) read from a JPEG/PNG/GIF/BMP/WebP header, or None.
+
+    Only the header bytes are inspected; the image is never decoded and the
+    buffer is never copied, which keeps cover status checks cheap for large
+    embedded artwork.
+    """
+    if not data: return None
+    try:
+        if data[:8] == _PNG_SIGNATURE:
+            # IHDR is always the first chunk: length(4) type(4) width(4) height(4)
+            if data[12:16] != b'IHDR': return None
+            return struct.unpack_from('>II', data, 16)
+        if data[:2] == b'\xff\xd8':
+            return _jpeg_size(data)
+        if data[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack_from('<HH', data, 6)
+        if data[:2] == b'BM':
+            # BITMAPINFOHEADER: width and (possibly negative, top-down) height
+            width, height = struct.unpack_from('<ii', data, 18)
+            return width, abs(height)
+        if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+            return _webp_size(data)
+    except struct.error:
+        pass
+    return None
+
+def _webp_size(data):
+    chunk = data[12:16]
+    if chunk == b'VP8X':
+        # 24-bit canvas width/height, minus one
+        w = int.from_bytes(data[24:27], 'little') + 1
+        h = int.from_bytes(data[27:30], 'little') + 1
+        return w, h
+    if chunk == b'VP8 ':
+        w, h = struct.unpack_from('<HH', data, 26)
+        return w & 0x3FFF, h & 0x3FFF
+    if chunk == b'VP8L':
+        bits = int.from_bytes(data[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    return None
+
+def _jpeg_size(data):
+    pos = 2
+    end = len(data)
+    while pos + 4 <= end:
+        if data[pos] != 0xFF:
+            return None # Lost sync, not a valid marker stream
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1 # Fill byte
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            pos += 2 # Standalone markers have no length
+            continue
+        length = struct.unpack_from('>H', data, pos + 2)[0]
+        if marker in _JPEG_SOF:
+            # length(2) precision(1) height(2) width(2)
+            height, width = struct.unpack_from('>HH', data, pos + 5)
+            return width, height
+        pos += 2 + length
+    return None
@@ -0,0 +1,149 @@
+import os
+import json
+import sqlite3
+import threading
+
+from core.config import ConfigManager
+
+# Bump when the stored record shape changes; older databases are rebuilt on open
+SCHEMA_VERSION = 1
+
+def _prefix_range(folder):
+    # [lo, hi) bounds matching every path inside folder; lets SQLite use the primary key
+    prefix = os.path.join(folder, "")
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+class TagIndex:
+    """Persistent tag cache keyed by (path, size, mtime_ns).
+
+    A cached record is only returned while the file on disk still has the
+    size and modification time it had when it was parsed, so edits made by
+    us or by other tools are picked up on the next lookup.
+    """
+
+    def __init__(self, db_path=None):
+        self.config = ConfigManager()
+        self.db_path = db_path or self.config.get("index", "path", "tagfix_index.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # v0 records carried full lyrics text
+                self._conn.execute("DROP TABLE IF EXISTS tracks")
+                self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS tracks (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    cover_status INTEGER NOT NULL DEFAULT 0,
+                    lyrics_status INTEGER NOT NULL DEFAULT 0,
+                    record TEXT NOT NULL
+                )
+            """)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def lookup(self, path, st=None):
+        """Return the cached tags for path, or None if missing or stale."""
+        try:
+            if st is None:
+                st = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, record FROM tracks WHERE path = ?", (path,)
+            ).fetchone()
+
+        if not row: return None
+        size, mtime_ns, record = row
+        if size != st.st_size or mtime_ns != st.st_mtime_ns:
+            return None
+
+        try:
+            return json.loads(record)
+        except ValueError:
+            return None
+
+    def store(self, path, tags, st=None):
+        self.store_many([(path, tags, st)])
+
+    def store_many(self, entries):
+        # entries: iterable of (path, tags, stat_result or None)
+        rows = []
+        for path, tags, st in entries:
+            try:
+                if st is None:
+                    st = os.stat(path)
+            except OSError:
+                continue
+            rows.append((
+                path,
+                st.st_size,
+                st.st_mtime_ns,
+                tags.get("cover_status", 0),
+                tags.get("lyrics_status", 0),
+                json.dumps(tags)
+            ))
+
+        if not rows: return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tracks (path, size, mtime_ns, cover_status, lyrics_status, record) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def get_tags(self, path, audio_handler):
+        """Return cached tags for path, parsing and storing them on a miss."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return audio_handler.get_tags(path)
+
+        tags = self.lookup(path, st)
+        if tags is not None:
+            return tags
+
+        tags = audio_handler.get_tags(path)
+        # Files mutagen could not read have no status keys; don't pin them in the index
+        if "cover_status" in tags:
+            self.store(path, tags, st)
+        return tags
+
+    def folder_stats(self, folder):
+        """Return (tracks, missing_covers, missing_lyrics) for indexed files under folder."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), SUM(cover_status = 0), SUM(lyrics_status = 0) FROM tracks "
+                "WHERE path >= ? AND path < ?",
+                _prefix_range(folder)
+            ).fetchone()
+        return (row[0] or 0, row[1] or 0, row[2] or 0)
+
+    def remove(self, path):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tracks WHERE path = ?", (path,))
+
+    def prune(self, folder, seen_paths):
+        """Drop entries under folder that were not seen by the last full scan."""
+        with self._lock:
+            known = [r[0] for r in self._conn.execute(
+                "SELECT path FROM tracks WHERE path >= ? AND path < ?",
+                _prefix_range(folder)
+            )]
+        stale = [(p,) for p in known if p not in seen_paths]
+        if not stale: return 0
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM tracks WHERE path = ?", stale)
+        return len(stale)
@@ -1,59 +1,96 @@
-import requests
 import urllib.parse
-import tempfile
-import os
 
 from core.config import ConfigManager
+from core.http_client import get_client
 
 class MetadataHandler:
     def __init__(self):
         self.mb_url = "https://musicbrainz.org/ws/2"
         self.cover_url = "https://coverartarchive.org"
+        self.itunes_url = "https://itunes.apple.com"
         self.lrc_url = "https://lrclib.net/api"
-        self.headers = {'User-Agent': 'TagFix/1.0 (https://github.com/tagfix)'}
         self.config = ConfigManager()
+        self.http = get_client() # Shared pooled session
 
-    def fetch_cover(self, artist, album):
+    # Cover lookups are written once, as generators that yield the URL they
+    # need next and are sent back its response. _run() drives them with the
+    # blocking client and _run_async() with the FetchEngine's asyncio one, so
+    # source order and fallbacks can't drift between the two.
+
+    def fetch_cover_bytes(self, artist, album):
+        return self._run(self._cover_steps(artist, album))
+
+    async def fetch_cover_bytes_async(self, artist, album):
+        """fetch_cover_bytes on the FetchEngine loop (same sources and fallbacks)."""
+        from core.fetch_engine import get_engine
+        return await self._run_async(self._cover_steps(artist, album), get_engine().http)
+
+    def fetch_from_itunes(self, artist, album):
+        return self._run(self._itunes_artwork_steps(artist, album))
+
+    def get_cover_bytes(self, mbid):
+        return self._run(self._cover_art_steps(mbid))
+
+    def _run(self, steps):
+        try:
+            url = next(steps)
+            while True:
+                try:
+                    resp = self.http.get(url)
+                except Exception as e:
+                    url = steps.throw(e)
+                    continue
+                url = steps.send(resp)
+        except StopIteration as done:
+            return done.value
+
+    async def _run_async(self, steps, http):
+        try:
+            url = next(steps)
+            while True:
+                try:
+                    resp = await http.get(url)
+                except Exception as e:
+                    url = steps.throw(e)
+                    continue
+                url = steps.send(resp)
+        except StopIteration as done:
+            return done.value
+
+    def _cover_steps(self, artist, album):
         source = self.config.get("covers", "source", "iTunes")
         
         if source == "iTunes":
             # iTunes First
-            url = self.fetch_from_itunes(artist, album)
-            if url:
-                if self._download_to_temp(url): return self._download_to_temp(url)
+            data = yield from self._itunes_cover_steps(artist, album)
+            if data: return data
             
             print("iTunes failed or no result, falling back to MusicBrainz...")
-            return self._fetch_from_musicbrainz(artist, album)
+            return (yield from self._musicbrainz_cover_steps(artist, album))
         else:
             # MusicBrainz First
-            path = self._fetch_from_musicbrainz(artist, album)
-            if path: return path
+            data = yield from self._musicbrainz_cover_steps(artist, album)
+            if data: return data
             
             print("MusicBrainz failed, falling back to iTunes...")
-            url = self.fetch_from_itunes(artist, album)
-            if url:
-                return self._download_to_temp(url)
-        return None
+            return (yield from self._itunes_cover_steps(artist, album))
 
-    def _download_to_temp(self, url):
+    def _itunes_cover_steps(self, artist, album):
+        url = yield from self._itunes_artwork_steps(artist, album)
+        if not url: return None
         try:
-            resp = requests.get(url, headers=self.headers)
+            resp = yield url
             if resp.status_code == 200:
-                tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".jpg")
-                tmp.write(resp.content)
-                tmp.close()
-                return tmp.name
+                return resp.content
         except Exception as e:
             print(f"Download error: {e}")
         return None
 
-    def fetch_from_itunes(self, artist, album):
+    def _itunes_artwork_steps(self, artist, album):
         try:
             term = f"{artist} {album}"
             encoded = urllib.parse.quote(term)
-            url = f"https://itunes.apple.com/search?term={encoded}&entity=album&limit=1"
-            
-            resp = requests.get(url, timeout=5)
+            resp = yield f"{self.itunes_url}/search?term={encoded}&entity=album&limit=1"
             if resp.status_code == 200:
                 data = resp.json()
                 if data.get('resultCount', 0) > 0:
@@ -68,59 +105,50 @@ class MetadataHandler:
             print(f"iTunes search error: {e}")
         return None
 
-    def _fetch_from_musicbrainz(self, artist, album):
+    def _musicbrainz_cover_steps(self, artist, album):
         try:
-            query = f'artist:"{artist}" AND release:"{album}"'
-            encoded = urllib.parse.quote(query)
-            url = f"{self.mb_url}/release?query={encoded}&fmt=json&limit=1"
-            
-            resp = requests.get(url, headers=self.headers)
+            resp = yield self._mb_release_url(artist, album, limit=1)
             if resp.status_code == 200:
                 data = resp.json()
                 releases = data.get('releases', [])
                 if releases:
                     mbid = releases[0]['id']
-                    return self._download_mb_cover(mbid)
+                    return (yield from self._cover_art_steps(mbid))
         except Exception as e:
             print(f"Cover fetch error: {e}")
         return None
 
-    def _download_mb_cover(self, mbid):
+    def _cover_art_steps(self, mbid):
         force_500 = self.config.get("covers", "force_500px", True)
         suffix = "front-500" if force_500 else "front"
         cover_url = f"{self.cover_url}/release/{mbid}/{suffix}"
         
         try:
-            img_resp = requests.get(cover_url, headers=self.headers)
-            if img_resp.status_code == 200:
-                tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".jpg")
-                tmp.write(img_resp.content)
-                tmp.close()
-                return tmp.name
-            elif force_500 and img_resp.status_code == 404:
-                # Fallback to original if 500px not found
+            resp = yield cover_url
+            if resp.status_code == 200:
+                return resp.content
+            elif force_500 and resp.status_code == 404:
+                # Fallback
                 cover_url = f"{self.cover_url}/release/{mbid}/front"
-                img_resp = requests.get(cover_url, headers=self.headers)
-                if img_resp.status_code == 200:
-                    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".jpg")
-                    tmp.write(img_resp.content)
-                    tmp.close()
-                    return tmp.name
-        except:
-            pass
+                resp = yield cover_url
+                if resp.status_code == 200:
+                    return resp.content
+        except Exception as e:
+            print(f"Get cover bytes error: {e}")
         return None
 
+    def _mb_release_url(self, artist, album, limit):
+        query = f'artist:"{artist}" AND release:"{album}"'
+        encoded = urllib.parse.quote(query)
+        return f"{self.mb_url}/release?query={encoded}&fmt=json&limit={limit}"
+
     # ... existing fetch_lyrics ...
 
     # ... existing search_releases ...
 
     def search_releases(self, artist, album):
         try:
-            query = f'artist:"{artist}" AND release:"{album}"'
-            encoded = urllib.parse.quote(query)
-            url = f"{self.mb_url}/release?query={encoded}&fmt=json&limit=10"
-            
-            resp = requests.get(url, headers=self.headers)
+            resp = self.http.get(self._mb_release_url(artist, album, limit=10))
             if resp.status_code == 200:
                 data = resp.json()
                 return data.get('releases', [])
@@ -128,32 +156,13 @@ class MetadataHandler:
             print(f"Search releases error: {e}")
         return []
 
-    def get_cover_bytes(self, mbid):
-        force_500 = self.config.get("covers", "force_500px", True)
-        suffix = "front-500" if force_500 else "front"
-        cover_url = f"{self.cover_url}/release/{mbid}/{suffix}"
-        
-        try:
-            resp = requests.get(cover_url, headers=self.headers)
-            if resp.status_code == 200:
-                return resp.content
-            elif force_500 and resp.status_code == 404:
-                # Fallback
-                cover_url = f"{self.cover_url}/release/{mbid}/front"
-                resp = requests.get(cover_url, headers=self.headers)
-                if resp.status_code == 200:
-                    return resp.content
-        except Exception as e:
-            print(f"Get cover bytes error: {e}")
-        return None
-
     def search_lyrics(self, artist, title, album):
         try:
             params = {
                 'q': f"{artist} {title} {album}".strip()
             }
             url = f"{self.lrc_url}/search"
-            resp = requests.get(url, params=params, headers=self.headers)
+            resp = self.http.get(url, params=params)
             if resp.status_code == 200:
                 return resp.json()
         except Exception as e:
@@ -0,0 +1,102 @@
+import os
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+from core.audio import AudioHandler
+from core.config import ConfigManager
+
+# Field order of the packed records sent back from worker processes
+RECORD_FIELDS = ("path", "filename", "title", "artist", "album", "albumartist", "year",
+                 "genre", "duration", "cover_status", "lyrics_status")
+
+_worker_handler = None
+
+def _pack(tags):
+    return tuple(tags.get(f) for f in RECORD_FIELDS)
+
+def _unpack(record):
+    # Absent keys stay absent so unreadable files keep their minimal {filename, path} shape
+    return {f: v for f, v in zip(RECORD_FIELDS, record) if v is not None}
+
+def _parse_chunk(paths, read_mode="file"):
+    # Runs inside a worker process: one handler per process, tuples over the pipe
+    global _worker_handler
+    if _worker_handler is None or _worker_handler.read_mode != read_mode:
+        _worker_handler = AudioHandler(read_mode)
+    return [_pack(_worker_handler.get_tags(p)) for p in paths]
+
+class ParseEngine:
+    """Fans get_tags() out over a process pool in chunks.
+
+    Tag parsing is CPU-bound Python and holds the GIL, so threads cannot use
+    more than one core. The pool is created by start() on the Tk thread and
+    reused across scans; workers are spawned rather than forked, since
+    forking a process that already runs Tk and worker threads can deadlock.
+
+    Only pool workers read with scan.read_mode ("mmap"): a file truncated
+    while mapped raises SIGBUS, which kills a worker (recoverable) but
+    would kill the app if the thread fallback mapped it in-process.
+    """
+
+    def __init__(self):
+        config = ConfigManager()
+        self.workers = config.get("scan", "workers", 0) or os.cpu_count() or 1
+        self.chunk_size = max(1, config.get("scan", "chunk_size", 64))
+        self.use_processes = config.get("scan", "use_processes", True)
+        self.read_mode = config.get("scan", "read_mode", "mmap")
+        self._executor = None
+
+    def start(self):
+        """Create the worker pool; call once from the Tk thread at startup."""
+        self._get_executor()
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.use_processes and self.workers > 1:
+                try:
+                    self._executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+                except (OSError, NotImplementedError) as e:
+                    print(f"Process pool unavailable, parsing in threads: {e}")
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, paths):
+        """Parse paths in the pool. Collect the tags with result(future, paths)."""
+        paths = list(paths)
+        try:
+            return self._submit(paths)
+        except BrokenProcessPool:
+            # A worker died (e.g. crashed in a tag parser); replace the pool
+            print("Parse pool broke, restarting it")
+            self.shutdown()
+            return self._submit(paths)
+
+    def _submit(self, paths):
+        executor = self._get_executor()
+        if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+            return executor.submit(_parse_chunk, paths, self.read_mode)
+        return executor.submit(_parse_chunk, paths)
+
+    def result(self, future, paths):
+        """Wait for a submit() future and return its unpacked tags.
+
+        If a worker died the pool is broken: this chunk is parsed here
+        instead, and the next submit() replaces the pool.
+        """
+        try:
+            records = future.result()
+        except BrokenProcessPool:
+            print(f"Parse worker died, parsing {len(paths)} files in-process")
+            records = _parse_chunk(paths)
+        return self.unpack(records)
+
+    def unpack(self, records):
+        return [_unpack(r) for r in records]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
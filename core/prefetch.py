@@ -0,0 +1,37 @@
+import threading
+
+class NeighborPrefetcher:
+    """Warms caches for the rows around the selection on a background thread.
+
+    warm(record) is called on the worker for each queued record and should
+    fill whatever caches the editor reads from. prefetch() replaces the
+    queue, so jumping elsewhere cancels everything not yet started.
+    """
+
+    def __init__(self, warm):
+        self.warm = warm
+        self._queue = []
+        self._wakeup = threading.Condition()
+
+        t = threading.Thread(target=self._run)
+        t.daemon = True
+        t.start()
+
+    def prefetch(self, records):
+        with self._wakeup:
+            self._queue = list(records)
+            self._wakeup.notify()
+
+    def cancel(self):
+        self.prefetch([])
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self._queue:
+                    self._wakeup.wait()
+                record = self._queue.pop(0)
+            try:
+                self.warm(record)
+            except Exception as e:
+                print(f"Prefetch failed for {record.path}: {e}")
@@ -0,0 +1,87 @@
+import time
+import threading
+
+from core.config import ConfigManager
+
+class TokenBucket:
+    """Allows `rate` requests per second with bursts of up to `burst`.
+
+    Callers reserve a token up front and are told how long to wait for it,
+    so concurrent workers queue in order instead of all retrying at once.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token; return the seconds to wait before using it."""
+        if self.rate <= 0: return 0.0 # Unlimited
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds):
+        """Hand out no new tokens for the next `seconds` (e.g. after a 429)."""
+        if self.rate <= 0: return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+class RateLimiter:
+    """Per-host token buckets shared by every network worker.
+
+    Limits come from the "ratelimit" settings: a host matches its own
+    entry or that of a parent domain, anything else gets "default".
+    """
+
+    def __init__(self):
+        config = ConfigManager()
+        self.enabled = config.get("ratelimit", "enabled", True)
+        self.default = config.get("ratelimit", "default", {"rate": 5.0, "burst": 5})
+        self.hosts = {h.lower(): v for h, v in config.get("ratelimit", "hosts", {}).items()}
+        # Same ceiling as the retry loop's backoff, so one bad Retry-After can't stall a host
+        self.max_pause = config.get("http", "max_backoff", 30.0)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        host = host.lower().rsplit(":", 1)[0]
+        key, limits = host, self.default
+        # "ia800.us.archive.org" uses the "archive.org" entry, sharing its bucket
+        parts = host.split(".")
+        for i in range(len(parts) - 1):
+            candidate = ".".join(parts[i:])
+            if candidate in self.hosts:
+                key, limits = candidate, self.hosts[candidate]
+                break
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(limits.get("rate", 5.0), limits.get("burst", 1))
+                self._buckets[key] = bucket
+            return bucket
+
+    def reserve(self, host):
+        """Reserve a request slot for host; return the seconds to wait for it."""
+        if not self.enabled: return 0.0
+        return self._bucket(host).reserve()
+
+    def wait(self, host):
+        """Block until a request to host is allowed."""
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, host, seconds):
+        """Hold back every worker's requests to host for `seconds` (at most max_pause)."""
+        if self.enabled and seconds > 0:
+            self._bucket(host).pause(min(seconds, self.max_pause))
@@ -0,0 +1,196 @@
+import os
+import time
+import queue
+import threading
+import collections
+
+from core.track import TrackRecord
+
+SUPPORTED_EXTS = ('.mp3', '.flac', '.m4a', '.ogg', '.wav')
+
+class _ScanJob:
+    def __init__(self, path):
+        self.path = path
+        self.cancelled = threading.Event()
+        self.results = queue.Queue()
+        self.started = time.monotonic()
+        self.count = 0
+        self.finished = False # Set on the Tk thread once the worker's end marker is seen
+
+class FolderScanner:
+    """Walks a folder tree and parses tags off the Tk thread.
+
+    Index hits are served from the scanner thread; misses are parsed in
+    chunks by the ParseEngine's process pool. Rows are handed to
+    on_batch(list_of_TrackRecords) on the Tk thread in small batches via
+    after(). Starting a new scan cancels the running one; rows from a
+    cancelled scan are never delivered.
+    """
+
+    def __init__(self, widget, engine, index=None, on_batch=None, on_done=None,
+                 poll_ms=30, frame_budget_ms=20):
+        self.widget = widget
+        self.engine = engine
+        self.index = index
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.poll_ms = poll_ms
+        self.frame_budget = frame_budget_ms / 1000.0
+        self._job = None
+        self._backlog = collections.deque()
+
+    def start(self, path):
+        self.cancel()
+        job = _ScanJob(path)
+        self._job = job
+        self._backlog.clear()
+
+        t = threading.Thread(target=self._run, args=(job,))
+        t.daemon = True
+        t.start()
+        self.widget.after(self.poll_ms, lambda: self._poll(job))
+
+    def cancel(self):
+        if self._job:
+            self._job.cancelled.set()
+            self._job = None
+        self._backlog.clear()
+
+    def is_running(self):
+        return self._job is not None
+
+    # --- Tk thread ---
+
+    def _poll(self, job):
+        if job is not self._job:
+            return # Superseded or cancelled
+
+        while not job.finished:
+            try:
+                item = job.results.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                job.finished = True
+                break
+            self._backlog.append(item)
+
+        # Deliver as many rows as fit in the frame budget, keep the rest for the next tick
+        deadline = time.monotonic() + self.frame_budget
+        while self._backlog and time.monotonic() < deadline:
+            rows = self._backlog.popleft()
+            if self.on_batch:
+                self.on_batch(rows)
+
+        if job.finished and not self._backlog:
+            self._job = None
+            if self.on_done:
+                self.on_done(job.path, job.count, time.monotonic() - job.started)
+            return
+
+        self.widget.after(1 if self._backlog else self.poll_ms, lambda: self._poll(job))
+
+    # --- Worker thread ---
+
+    def _walk(self, path, job):
+        # Top-down like os.walk: files of a folder first, then its subfolders
+        stack = [path]
+        while stack and not job.cancelled.is_set():
+            current = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.path)
+                            elif entry.name.lower().endswith(SUPPORTED_EXTS) and entry.is_file():
+                                yield entry
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+            stack.extend(reversed(subdirs))
+
+    def _lookup_chunk(self, entries, job):
+        # Serve index hits directly; returns (slots, miss_paths, future) where a slot
+        # is (tags or None, stat) and None marks a miss to be filled from the pool
+        slots = []
+        misses = []
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            tags = self.index.lookup(entry.path, st) if self.index else None
+            if tags is None:
+                misses.append(entry.path)
+            slots.append((tags, st))
+        future = self.engine.submit(misses) if misses and not job.cancelled.is_set() else None
+        return slots, misses, future
+
+    def _run(self, job):
+        seen = set()
+        pending = []
+        in_flight = collections.deque()
+        chunk = []
+        max_in_flight = self.engine.workers * 2
+        # Flush the first rows almost immediately, then settle into larger batches
+        chunk_size = 4
+
+        def drain(block):
+            while in_flight and (block or in_flight[0][2] is None or in_flight[0][2].done()):
+                slots, misses, future = in_flight.popleft()
+                # Misses of a cancelled scan were never submitted (or are dropped); keep the hits
+                parsed = None
+                if future and not job.cancelled.is_set():
+                    parsed = iter(self.engine.result(future, misses))
+                elif future:
+                    future.cancel()
+                rows = []
+                for tags, st in slots:
+                    if tags is None:
+                        if parsed is None:
+                            continue
+                        tags = next(parsed)
+                        # Files mutagen could not read have no status keys; don't pin them in the index
+                        if "cover_status" in tags:
+                            pending.append((tags["path"], tags, st))
+                    rows.append(TrackRecord.from_tags(tags, st))
+                    seen.add(tags["path"])
+                if rows and not job.cancelled.is_set():
+                    job.count += len(rows)
+                    job.results.put(rows)
+                block = block and len(in_flight) >= max_in_flight
+
+        try:
+            for entry in self._walk(job.path, job):
+                chunk.append(entry)
+                if len(chunk) >= chunk_size:
+                    in_flight.append(self._lookup_chunk(chunk, job))
+                    chunk = []
+                    chunk_size = self.engine.chunk_size
+                    drain(len(in_flight) >= max_in_flight)
+
+                if self.index and len(pending) >= 200:
+                    self.index.store_many(pending)
+                    pending = []
+
+            if chunk and not job.cancelled.is_set():
+                in_flight.append(self._lookup_chunk(chunk, job))
+
+            if job.cancelled.is_set():
+                for _, _, future in in_flight:
+                    if future: future.cancel()
+                in_flight.clear()
+            while in_flight:
+                drain(True)
+
+            if self.index:
+                self.index.store_many(pending)
+                if not job.cancelled.is_set():
+                    self.index.prune(job.path, seen)
+        except Exception as e:
+            print(f"Scan error in {job.path}: {e}")
+        finally:
+            job.results.put(None)
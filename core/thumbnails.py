@@ -0,0 +1,174 @@
+import io
+import os
+import hashlib
+import threading
+
+from core.cache import LRUCache
+from core.config import ConfigManager
+
+_MISS = object() # None is a valid cached value (no cover)
+
+class Thumbnail:
+    """A decoded cover thumbnail plus the size of the embedded original.
+
+    image is a small PIL image (None if the embedded cover could not be
+    decoded); PhotoImages must be made from it on the Tk thread.
+    """
+
+    __slots__ = ("image", "width", "height")
+
+    def __init__(self, image, width=0, height=0):
+        self.image = image
+        self.width = width
+        self.height = height
+
+class ThumbnailService:
+    """Decodes cover thumbnails off the Tk thread.
+
+    Lookups go memory LRU -> on-disk cache -> embedded cover. Only the most
+    recent request is worked on; older ones are dropped when a newer one
+    arrives, and a result whose token is no longer current is discarded, so
+    holding an arrow key never queues up decodes for rows already passed.
+    """
+
+    def __init__(self, widget, audio_handler, size=(200, 200)):
+        config = ConfigManager()
+        self.widget = widget
+        self.audio_handler = audio_handler
+        self.size = size
+        self.cache_dir = config.get("thumbnails", "cache_dir", "thumbnail_cache")
+        self.max_files = config.get("thumbnails", "max_files", 5000)
+        self.memory = LRUCache(config.get("thumbnails", "memory_items", 128))
+        self._token = 0
+        self._pending = None # (token, path, mtime_ns, callback)
+        self._wakeup = threading.Condition()
+        self._writes = 0
+
+        t = threading.Thread(target=self._run)
+        t.daemon = True
+        t.start()
+
+    def request(self, path, mtime_ns, callback):
+        """Deliver the Thumbnail (or None when there is no cover) to callback on the Tk thread.
+
+        Memory hits are delivered synchronously. Returns the request token.
+        """
+        thumb = self.memory.get((path, mtime_ns), _MISS)
+        with self._wakeup:
+            self._token += 1
+            token = self._token
+            if thumb is _MISS:
+                self._pending = (token, path, mtime_ns, callback)
+                self._wakeup.notify()
+            else:
+                self._pending = None
+        if thumb is not _MISS:
+            callback(thumb)
+        return token
+
+    def cancel(self):
+        with self._wakeup:
+            self._token += 1
+            self._pending = None
+
+    # --- Worker thread ---
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while self._pending is None:
+                    self._wakeup.wait()
+                token, path, mtime_ns, callback = self._pending
+                self._pending = None
+
+            thumb = self.get(path, mtime_ns)
+            self.widget.after(0, lambda t=token, cb=callback, th=thumb: self._deliver(t, cb, th))
+
+    def _deliver(self, token, callback, thumb):
+        if token == self._token:
+            callback(thumb)
+
+    def get(self, path, mtime_ns):
+        """Blocking lookup; safe to call from any thread."""
+        key = (path, mtime_ns)
+        thumb = self.memory.get(key, _MISS)
+        if thumb is not _MISS:
+            return thumb
+
+        disk_path = self._disk_path(path, mtime_ns)
+        thumb = self._load_disk(disk_path)
+        if thumb is None:
+            data = self.audio_handler.get_cover(path)
+            thumb = self._decode(data) if data else None
+            if thumb is not None and thumb.image is not None:
+                self._save_disk(disk_path, thumb)
+        self.memory.put(key, thumb)
+        return thumb
+
+    def _decode(self, data):
+        from PIL import Image
+        try:
+            img = Image.open(io.BytesIO(data))
+            width, height = img.size
+            if img.format == "JPEG":
+                # Let libjpeg decode at 1/2, 1/4 or 1/8 scale; never smaller than requested
+                img.draft("RGB", self.size)
+            img.thumbnail(self.size)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+            return Thumbnail(img, width, height)
+        except Exception as e:
+            print(f"Thumbnail decode failed: {e}")
+            return Thumbnail(None)
+
+    # --- On-disk cache ---
+
+    def _disk_path(self, path, mtime_ns):
+        digest = hashlib.sha1(f"{path}\0{mtime_ns}\0{self.size}".encode("utf-8", "surrogateescape")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + ".png")
+
+    def _load_disk(self, disk_path):
+        from PIL import Image
+        try:
+            with Image.open(disk_path) as img:
+                img.load()
+                width, height = (int(v) for v in img.text["original"].split("x"))
+                return Thumbnail(img.copy(), width, height)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save_disk(self, disk_path, thumb):
+        from PIL.PngImagePlugin import PngInfo
+        info = PngInfo()
+        info.add_text("original", f"{thumb.width}x{thumb.height}")
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            tmp_path = f"{disk_path}.{threading.get_ident()}.tmp" # The prefetcher may write the same entry
+            thumb.image.save(tmp_path, format="PNG", pnginfo=info)
+            os.replace(tmp_path, disk_path)
+        except OSError as e:
+            print(f"Could not cache thumbnail: {e}")
+            return
+
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._trim_disk()
+
+    def _trim_disk(self):
+        # Oldest thumbnails go first; entries for edited files are never hit again anyway
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                full = os.path.join(root, name)
+                try:
+                    entries.append((os.stat(full).st_mtime, full))
+                except OSError:
+                    continue
+        if len(entries) <= self.max_files:
+            return
+        entries.sort()
+        for _, full in entries[:len(entries) - self.max_files]:
+            try:
+                os.unlink(full)
+            except OSError:
+                pass
@@ -0,0 +1,90 @@
+import os
+import sys
+
+# Text fields shown in the table and editor, in column order
+TAG_KEYS = ("title", "artist", "album", "albumartist", "year", "genre")
+
+# Repeated across every track of an album, so share one string object per value
+_INTERNED_KEYS = ("artist", "album", "albumartist", "year", "genre")
+
+def _intern(value):
+    if isinstance(value, str) and value:
+        return sys.intern(value)
+    return value or ""
+
+class TrackRecord:
+    """One scanned track: the single source of truth for table, editor and dialogs.
+
+    Uses __slots__ instead of a per-track dict; with hundreds of thousands of
+    tracks loaded the dict overhead and duplicated artist/album strings were
+    most of the memory. Lyrics text is not kept; only lyrics_status is, and
+    the editor loads the text through AudioHandler.get_lyrics() on demand.
+    """
+
+    __slots__ = ("path", "title", "artist", "album", "albumartist", "year", "genre",
+                 "duration", "cover_status", "lyrics_status", "size", "mtime_ns")
+
+    def __init__(self, path, title="", artist="", album="", albumartist="", year="", genre="",
+                 duration=0, cover_status=0, lyrics_status=0, size=0, mtime_ns=0):
+        self.path = path
+        self.title = title or ""
+        self.artist = _intern(artist)
+        self.album = _intern(album)
+        self.albumartist = _intern(albumartist)
+        self.year = _intern(year)
+        self.genre = _intern(genre)
+        self.duration = duration or 0
+        self.cover_status = cover_status or 0
+        self.lyrics_status = lyrics_status or 0
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @classmethod
+    def from_tags(cls, tags, st=None):
+        record = cls(tags["path"])
+        record.update(tags, st)
+        return record
+
+    def update(self, tags, st=None):
+        """Refresh fields from a get_tags() dict (and optionally an os.stat result)."""
+        self.title = tags.get("title") or ""
+        for key in _INTERNED_KEYS:
+            setattr(self, key, _intern(tags.get(key)))
+        self.duration = tags.get("duration") or 0
+        self.cover_status = tags.get("cover_status") or 0
+        self.lyrics_status = tags.get("lyrics_status") or 0
+        if st is not None:
+            self.size = st.st_size
+            self.mtime_ns = st.st_mtime_ns
+
+    def copy_from(self, other):
+        for slot in self.__slots__:
+            setattr(self, slot, getattr(other, slot))
+
+    def to_tags(self):
+        tags = {
+            "filename": self.filename,
+            "path": self.path,
+            "duration": self.duration,
+            "cover_status": self.cover_status,
+            "lyrics_status": self.lyrics_status
+        }
+        for key in TAG_KEYS:
+            tags[key] = getattr(self, key)
+        return tags
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+
+    @property
+    def status(self):
+        return (self.cover_status, self.lyrics_status)
+
+    def row_values(self):
+        # Matches TrackTable.columns
+        return (self.filename, self.title, self.artist, self.album,
+                self.albumartist, self.year, self.genre)
+
+    def __repr__(self):
+        return f"TrackRecord({self.path!r})"
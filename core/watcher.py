@@ -0,0 +1,330 @@
+import os
+import time
+import ctypes
+import queue
+import select
+import struct
+import threading
+
+from core.audio import AudioHandler
+from core.scanner import SUPPORTED_EXTS
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, len
+
+# Change kinds delivered to on_changes
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted" # a file, or a folder whose tracks are all gone
+RESCAN = "rescan" # events were lost; the caller should rescan the root
+
+def _is_audio(path):
+    return path.lower().endswith(SUPPORTED_EXTS)
+
+def _merge(old, new):
+    # Coalesce two pending events for the same path
+    if old == CREATED and new == MODIFIED:
+        return CREATED
+    if old == CREATED and new == DELETED:
+        return None # Appeared and vanished within the debounce window
+    if old == DELETED and new == CREATED:
+        return MODIFIED # Replaced (e.g. a tag editor writing a temp file and renaming it)
+    return new
+
+class _InotifyBackend:
+    """Recursive inotify watch on Linux (one watch per folder).
+
+    Subtrees that can't get a watch (e.g. the user's watch limit is used
+    up) are stat-polled every interval instead of going unwatched.
+    """
+
+    def __init__(self, root, emit, stop_event, interval):
+        import ctypes.util
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.root = root
+        self.emit = emit
+        self.stop_event = stop_event
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {} # wd -> folder path
+        self.interval = interval
+        self.poller = _PollingBackend([], emit, stop_event, interval)
+
+    def _add_tree(self, folder, emit_files=False):
+        stack = [folder]
+        while stack and not self.stop_event.is_set():
+            current = stack.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(current), WATCH_MASK | IN_ONLYDIR)
+            if wd < 0:
+                # Watch limit reached or similar: poll this folder and everything below it
+                print(f"Cannot watch {current} (errno {ctypes.get_errno()}), polling it instead")
+                self.poller.add_root(current)
+                continue
+            self.watches[wd] = current
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif emit_files and _is_audio(entry.name):
+                            # Files moved in with a folder produce no events of their own
+                            self.emit(entry.path, CREATED)
+            except OSError:
+                continue
+
+    def _drop_tree(self, folder):
+        prefix = os.path.join(folder, "")
+        for wd, path in list(self.watches.items()):
+            if path == folder or path.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+        self.poller.remove_roots(folder)
+
+    def run(self):
+        self._add_tree(self.root)
+        last_poll = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                if self.poller.roots and time.monotonic() - last_poll >= self.interval:
+                    self.poller.check()
+                    last_poll = time.monotonic()
+                ready, _, _ = select.select([self.fd], [], [], 0.5)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._dispatch(data)
+        finally:
+            os.close(self.fd)
+
+    def _dispatch(self, data):
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self.emit(self.root, RESCAN)
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            folder = self.watches.get(wd)
+            if folder is None:
+                continue
+            path = os.path.join(folder, name) if name else folder
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path, emit_files=True)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._drop_tree(path)
+                    self.emit(path, DELETED)
+                continue
+
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if folder == self.root:
+                    self.emit(self.root, RESCAN)
+                continue
+            if not _is_audio(name):
+                continue
+
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self.emit(path, DELETED)
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                self.emit(path, CREATED)
+            elif mask & (IN_CLOSE_WRITE | IN_ATTRIB):
+                self.emit(path, MODIFIED)
+
+class _PollingBackend:
+    """Fallback for platforms without inotify: diff (size, mtime) snapshots."""
+
+    def __init__(self, roots, emit, stop_event, interval):
+        self.roots = list(roots)
+        self.emit = emit
+        self.stop_event = stop_event
+        self.interval = interval
+        self.previous = {}
+
+    def add_root(self, root):
+        self.roots.append(root)
+        self.previous.update(self._snapshot([root]))
+
+    def remove_roots(self, folder):
+        prefix = os.path.join(folder, "")
+        self.roots = [r for r in self.roots if r != folder and not r.startswith(prefix)]
+
+    def _snapshot(self, roots=None):
+        snap = {}
+        stack = list(self.roots if roots is None else roots)
+        while stack and not self.stop_event.is_set():
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif _is_audio(entry.name):
+                                st = entry.stat()
+                                snap[entry.path] = (st.st_size, st.st_mtime_ns)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return snap
+
+    def check(self):
+        current = self._snapshot()
+        if self.stop_event.is_set():
+            return
+        previous = self.previous
+        for path, sig in current.items():
+            old = previous.get(path)
+            if old is None:
+                self.emit(path, CREATED)
+            elif old != sig:
+                self.emit(path, MODIFIED)
+        for path in previous.keys() - current.keys():
+            self.emit(path, DELETED)
+        self.previous = current
+
+    def run(self):
+        self.previous = self._snapshot()
+        while not self.stop_event.wait(self.interval):
+            self.check()
+
+class LibraryWatcher:
+    """Watches a library root and reports debounced changes on the Tk thread.
+
+    Raw events are coalesced per path. Once a path has been quiet for the
+    debounce interval its change is resolved off the Tk thread (re-parsed
+    through the tag index, or dropped from it) and handed to
+    on_changes(list of (kind, path, tags, stat)) via after().
+    """
+
+    def __init__(self, widget, on_changes, index=None, debounce_ms=750, poll_interval=10.0):
+        self.widget = widget
+        self.on_changes = on_changes
+        self.index = index
+        self.debounce = debounce_ms / 1000.0
+        self.poll_interval = poll_interval
+        self.root = None
+        self._stop = None
+        self._lock = threading.Lock()
+        self._pending = {} # path -> (kind, last event time)
+        self._results = queue.Queue()
+        self._audio_handler = AudioHandler()
+
+    def watch(self, root):
+        if root == self.root and self._stop:
+            return
+        self.stop()
+        self.root = root
+        stop = threading.Event()
+        self._stop = stop
+
+        for target in (self._run_backend, self._run_resolver):
+            t = threading.Thread(target=target, args=(root, stop))
+            t.daemon = True
+            t.start()
+        self.widget.after(int(self.debounce * 1000), lambda: self._poll(stop))
+
+    def stop(self):
+        if self._stop:
+            self._stop.set()
+            self._stop = None
+        with self._lock:
+            self._pending.clear()
+        self.root = None
+
+    def _emit(self, path, kind):
+        with self._lock:
+            old = self._pending.get(path)
+            merged = _merge(old[0], kind) if old else kind
+            if merged is None:
+                del self._pending[path]
+            else:
+                self._pending[path] = (merged, time.monotonic())
+
+    def _run_backend(self, root, stop):
+        backend = None
+        try:
+            backend = _InotifyBackend(root, self._emit, stop, self.poll_interval)
+        except (OSError, AttributeError) as e:
+            # No inotify (non-Linux, or no libc symbol): poll instead
+            print(f"inotify unavailable, polling for changes: {e}")
+        try:
+            if backend is None:
+                backend = _PollingBackend([root], self._emit, stop, self.poll_interval)
+            backend.run()
+        except Exception as e:
+            print(f"Watcher error for {root}: {e}")
+
+    def _run_resolver(self, root, stop):
+        while not stop.wait(self.debounce / 2):
+            now = time.monotonic()
+            with self._lock:
+                ready = [(p, k) for p, (k, t) in self._pending.items() if now - t >= self.debounce]
+                for path, _ in ready:
+                    del self._pending[path]
+            if not ready:
+                continue
+
+            changes = []
+            for path, kind in ready:
+                if kind == DELETED or kind == RESCAN:
+                    if kind == DELETED and self.index:
+                        self.index.remove(path)
+                        self.index.prune(path, set()) # In case it was a folder
+                    changes.append((kind, path, None, None))
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue # Gone again before we got to it
+                if self.index:
+                    tags = self.index.get_tags(path, self._audio_handler)
+                else:
+                    tags = self._audio_handler.get_tags(path)
+                changes.append((kind, path, tags, st))
+
+            if changes and not stop.is_set():
+                self._results.put((stop, changes))
+
+    def _poll(self, stop):
+        if stop.is_set():
+            return
+        while True:
+            try:
+                owner, changes = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if owner is stop and self.on_changes:
+                self.on_changes(changes)
+        self.widget.after(int(self.debounce * 1000), lambda: self._poll(stop))
@@ -5,6 +5,7 @@ from gui.tabs.browser import BrowserTab
 from gui.tabs.editor import EditorTab
 from gui.table import TrackTable
 from core.audio import AudioHandler
+from core.config import ConfigManager
 
 class TagFixApp:
     def __init__(self, root):
@@ -112,20 +113,39 @@ class TagFixApp:
         self.paned.pack(fill=tk.BOTH, expand=True)
         
         self.audio_handler = AudioHandler()
-        self.tracks_cache = {}
+        
+        # Persistent tag index so re-opening a scanned folder only re-parses changed files
+        self.index = None
+        if ConfigManager().get("index", "enabled", True):
+            try:
+                from core.index import TagIndex
+                self.index = TagIndex()
+            except Exception as e:
+                print(f"Tag index unavailable: {e}")
         
         self.current_path = os.path.expanduser("~")
         
+        from core.parse_engine import ParseEngine
+        from core.scanner import FolderScanner
+        self.parse_engine = ParseEngine()
+        self.parse_engine.start()
+        self.scanner = FolderScanner(self.root, self.parse_engine, self.index,
+                                     on_batch=self._on_scan_batch, on_done=self._on_scan_done)
+        
         self.editor = EditorTab(self.paned, self.on_save_tags, self.audio_handler)
         self.paned.add(self.editor, weight=1)
         
+        from core.prefetch import NeighborPrefetcher
+        self.prefetcher = NeighborPrefetcher(self.editor.warm_track)
+        self.prefetch_radius = ConfigManager().get("editor", "prefetch_radius", 5)
+        
         self.table = TrackTable(self.paned, refresh_callback=self.refresh_current_folder, on_track_updated=self.on_track_updated)
         self.paned.add(self.table, weight=3)
         
-        self.browser = BrowserTab(self.paned, self.on_folder_selected)
+        self.browser = BrowserTab(self.paned, self.on_folder_selected, index=self.index)
         self.paned.add(self.browser, weight=1)
         
-        self.table.tree.bind("<<TreeviewSelect>>", self.on_track_selected)
+        self.table.tree.bind("<<TreeviewSelect>>", self.on_track_selected, add="+")
         
         # We need to pass browser.log to table, but table is created before browser.
         # Let's create browser first?
@@ -141,6 +161,15 @@ class TagFixApp:
         self.table.set_log_callback(self.browser.log)
         
         self.browser.set_root(self.current_path)
+        
+        # Watch the scanned folder so external changes update rows instead of needing a full Refresh
+        self.watcher = None
+        config = ConfigManager()
+        if config.get("watcher", "enabled", True):
+            from core.watcher import LibraryWatcher
+            self.watcher = LibraryWatcher(self.root, self._on_library_changes, self.index,
+                                          debounce_ms=config.get("watcher", "debounce_ms", 750),
+                                          poll_interval=config.get("watcher", "poll_interval", 10.0))
 
     def refresh_current_folder(self):
         if self.current_path:
@@ -149,42 +178,78 @@ class TagFixApp:
     def on_folder_selected(self, path):
         self.current_path = path
         self.table.clear()
-        self.tracks_cache = {}
-        try:
-            supported_exts = ('.mp3', '.flac', '.m4a', '.ogg', '.wav')
-            for root, dirs, files in os.walk(path):
-                for f in files:
-                    if f.lower().endswith(supported_exts):
-                        fullpath = os.path.join(root, f)
-                        tags = self.audio_handler.get_tags(fullpath)
-                        item_id = self.table.add_track(tags)
-                        self.tracks_cache[item_id] = tags
-        except OSError:
-            pass
+        self.prefetcher.cancel()
+        # Starting a new scan cancels the previous one
+        self.scanner.start(path)
+        
+        if self.watcher:
+            self.watcher.watch(path) # No-op if already watching it
+
+    def _on_scan_batch(self, records):
+        self.table.add_tracks(records)
+
+    def _on_scan_done(self, path, count, elapsed):
+        self.browser.log(f"Scanned {count} files in {elapsed:.1f}s: {os.path.basename(path) or path}")
+        self.browser.update_counts(path) # The scan may have filled in index entries
+
+    def _on_library_changes(self, changes):
+        from core.watcher import DELETED, RESCAN
+        shown = os.path.join(self.current_path, "")
+        deleted = set()
+        for kind, path, tags, st in changes:
+            if kind == RESCAN:
+                self.browser.log("File watcher overflowed, rescanning")
+                self.refresh_current_folder()
+                return
+            if kind == DELETED:
+                deleted.add(path)
+            elif path.startswith(shown):
+                item_id = self.table.find_item(path)
+                record = self.table.records.get(item_id)
+                if record and record.size == st.st_size and record.mtime_ns == st.st_mtime_ns:
+                    continue # Our own save; the row was already refreshed
+                self.table.update_track(tags, st)
+                if self.editor.current_track and self.editor.current_track.path == path:
+                    self.editor.load_track(self.table.records[self.table.find_item(path)])
+        
+        if deleted:
+            # A deleted folder takes all of its tracks with it: one pass, checking each row's ancestors
+            removed = [p for p in self.table.path_items if p in deleted or self._under(p, deleted)]
+            self.table.remove_tracks(removed)
+        self.browser.log(f"Library changed: {len(changes)} update(s)")
+
+    def _under(self, path, folders):
+        parent = os.path.dirname(path)
+        while parent not in folders:
+            up = os.path.dirname(parent)
+            if up == parent:
+                return False
+            parent = up
+        return True
 
     def on_track_selected(self, event):
         selection = self.table.tree.selection()
         if selection:
             item_id = selection[0]
-            track_data = self.tracks_cache.get(item_id)
-            if track_data:
-                self.editor.load_track(track_data)
+            record = self.table.records.get(item_id)
+            # A virtual table re-selects a row when it scrolls back into view; don't reload for that
+            if record and record is not self.editor.current_track:
+                self.editor.load_track(record)
+                # Warm the rows around it so stepping through the list is instant
+                self.prefetcher.prefetch(self.table.neighbors(item_id, self.prefetch_radius))
 
     def on_track_updated(self, filepath):
-        # Re-read tags
-        tags = self.audio_handler.get_tags(filepath)
-        if not tags: return
-
-        # Update cache
-        # We need to find the item_id for this filepath
-        for item_id, data in self.tracks_cache.items():
-            if data["path"] == filepath:
-                self.tracks_cache[item_id] = tags
-                break
+        # TrackTable.refresh_row has already re-read the file into the shared record
+        item_id = self.table.find_item(filepath)
+        record = self.table.records.get(item_id)
+        if not record: return
+        
+        if self.index:
+            self.index.store(filepath, record.to_tags())
         
         # If the updated file is currently loaded in the editor, reload it
-        if self.editor.current_track and self.editor.current_track["path"] == filepath:
-            self.editor.load_track(tags)
+        if self.editor.current_track and self.editor.current_track.path == filepath:
+            self.editor.load_track(record)
 
     def on_save_tags(self, filepath, tags):
         if tags is None:
@@ -192,10 +257,13 @@ class TagFixApp:
             self.table.refresh_row(filepath)
             return True
             
-        if self.audio_handler.save_tags(filepath, tags):
+        from core.audio import UNCHANGED
+        result = self.audio_handler.save_tags(filepath, tags)
+        if result == UNCHANGED:
+            return result # Nothing was written, the row is still accurate
+        if result:
             # Update Table and Cache via refresh_row
-            # This ensures item_status is updated in the table, 
-            # and on_track_updated is called to update app cache and editor.
+            # This re-reads the file into the table's TrackRecord,
+            # and on_track_updated is called to update the index and editor.
             self.table.refresh_row(filepath)
-            return True
-        return False
+        return result
@@ -2,22 +2,26 @@ import tkinter as tk
 from tkinter import ttk
 import threading
 import os
-from core.audio import AudioHandler
+from core.audio import AudioHandler, SAVED, UNCHANGED
+from core.batch_writer import BatchWriter
+from core.track import TrackRecord
 from core.metadata import MetadataHandler
 import io
 from PIL import Image
 
 class BatchEditDialog(tk.Toplevel):
-    def __init__(self, parent, file_paths, status_map=None, on_update=None):
+    def __init__(self, parent, records, on_update=None):
         super().__init__(parent)
         self.title("Batch Editor")
         self.geometry("600x700")
         self.configure(bg='#1e1e1e')
-        self.file_paths = file_paths
-        self.status_map = status_map or {}
+        self.records = records # TrackRecords from the table; not modified here
+        self.file_paths = [r.path for r in records]
         self.on_update = on_update
         self.audio_handler = AudioHandler()
         self.metadata_handler = MetadataHandler()
+        self.writer = BatchWriter(self.after)
+        self.cover_cancel = None # threading.Event while a cover fetch runs
         
         # Make modal
         self.transient(parent)
@@ -52,7 +56,7 @@ class BatchEditDialog(tk.Toplevel):
         ttk.Button(action_frame, text="Resize All Covers (500x500)", command=self.resize_all_covers).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
         # --- Middle Section: File List ---
-        list_frame = ttk.LabelFrame(self.main_frame, text=f"Files to Edit ({len(file_paths)})")
+        list_frame = ttk.LabelFrame(self.main_frame, text=f"Files to Edit ({len(records)})")
         list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
         columns = ("filename", "title")
@@ -78,13 +82,45 @@ class BatchEditDialog(tk.Toplevel):
         self.status_label = ttk.Label(footer_frame, text="Ready")
         self.status_label.pack(side=tk.LEFT)
         
-        ttk.Button(footer_frame, text="Apply Changes", command=self.apply_changes).pack(side=tk.RIGHT, padx=5)
-        ttk.Button(footer_frame, text="Cancel", command=self.destroy).pack(side=tk.RIGHT, padx=5)
+        self.apply_btn = ttk.Button(footer_frame, text="Apply Changes", command=self.apply_changes)
+        self.apply_btn.pack(side=tk.RIGHT, padx=5)
+        ttk.Button(footer_frame, text="Cancel", command=self.cancel).pack(side=tk.RIGHT, padx=5)
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        
+    def cancel(self):
+        # First press stops a running write job or cover fetch; _on_complete closes the dialog once it winds down
+        if self.writer.is_running():
+            if not self.writer.is_cancelling():
+                self.writer.cancel()
+                self.status_label.configure(text="Cancelling...")
+            return
+        if self.cover_cancel is not None:
+            if not self.cover_cancel.is_set():
+                self.cover_cancel.set()
+                self.status_label.configure(text="Cancelling...")
+            return
+        self.destroy()
+
+    def destroy(self):
+        # Also reached when the parent window goes away: stop handing out work
+        self.writer.cancel()
+        if self.cover_cancel is not None:
+            self.cover_cancel.set()
+        super().destroy()
         
     def _populate_list(self):
-        for path in self.file_paths:
-            tags = self.audio_handler.get_tags(path)
-            self.tree.insert("", "end", values=(os.path.basename(path), tags.get("title", "")))
+        for record in self.records:
+            self.tree.insert("", "end", values=(record.filename, record.title))
+
+    def _current(self, record):
+        """Return record, or a fresh read of its file if it changed since the scan (None if gone)."""
+        try:
+            st = os.stat(record.path)
+        except OSError:
+            return None
+        if st.st_size == record.size and st.st_mtime_ns == record.mtime_ns:
+            return record
+        return TrackRecord.from_tags(self.audio_handler.get_tags(record.path), st)
             
     def apply_changes(self):
         # Get values to update
@@ -95,65 +131,59 @@ class BatchEditDialog(tk.Toplevel):
             return
             
         self.status_label.configure(text="Applying changes...")
+        self.apply_btn.configure(state="disabled")
+        before = self.audio_handler.write_stats()
         
-        def worker():
-            count = 0
-            modified_paths = []
-            for path in self.file_paths:
-                tags = self.audio_handler.get_tags(path)
-                # Apply updates
-                for k, v in updates.items():
-                    tags[k] = v
-                
-                if self.audio_handler.save_tags(path, tags):
-                    count += 1
-                    modified_paths.append(path)
-                    
-            self.after(0, lambda: self._on_complete(f"Updated {count} files.", modified_paths))
+        def progress(done, total):
+            self.status_label.configure(text=f"Applying changes... {done}/{total}")
+        
+        def done(results, cancelled):
+            modified_paths = [p for p, r in results.items() if r == SAVED]
+            unchanged = sum(1 for r in results.values() if r == UNCHANGED)
+            failed = len(results) - len(modified_paths) - unchanged
             
-        t = threading.Thread(target=worker)
-        t.daemon = True
-        t.start()
+            message = f"Updated {len(modified_paths)} files, {unchanged} unchanged."
+            if failed:
+                message += f" {failed} failed."
+            if cancelled:
+                message = f"Cancelled after {len(results)} of {len(self.file_paths)} files. " + message
+            message += self._rewrite_note(before)
+            self._on_complete(message, modified_paths)
+        
+        # save_tags only touches the given keys and skips files that already match
+        self.writer.start(self.file_paths, lambda path: self.audio_handler.save_tags(path, updates),
+                          on_progress=progress, on_done=done)
         
     def fetch_all_covers(self):
+        if self.cover_cancel is not None:
+            return # Already fetching
         self.status_label.configure(text="Fetching covers...")
+        cancelled = self.cover_cancel = threading.Event()
         
         def worker():
-            count = 0
-            modified_paths = []
-            for path in self.file_paths:
-                # Optimization: Check cached status first
-                status = self.status_map.get(path)
-                if status:
-                    c_stat = status[0]
-                    # Green (2) or Yellow (1) -> Skip (User requirement: "If Status is Green... SKIP", "If Status is Yellow... SKIP")
-                    # Only process if Red (0)
-                    if c_stat != 0:
-                        continue
-                else:
-                    # Fallback to disk check if no cache
-                    tags = self.audio_handler.get_tags(path)
-                    if tags.get('cover_status', 0) != 0:
-                        continue
-
-                tags = self.audio_handler.get_tags(path)
-                artist = tags.get("artist")
-                album = tags.get("album")
-                
-                if artist and album:
-                    # Use the new fetch_cover logic (iTunes priority)
-                    cover_path = self.metadata_handler.fetch_cover(artist, album)
-                    if cover_path:
-                        with open(cover_path, 'rb') as f:
-                            data = f.read()
-                        if self.audio_handler.set_cover(path, data):
-                            count += 1
-                            modified_paths.append(path)
-                            # Update status map for subsequent ops
-                            self.status_map[path] = (2, self.status_map.get(path, (0,0))[1])
-                        os.unlink(cover_path)
-                        
-            self.after(0, lambda: self._on_complete(f"Fetched {count} covers.", modified_paths))
+            before = self.audio_handler.write_stats()
+            missing = []
+            for record in self.records:
+                # Scanned values, unless the file changed since (e.g. a cover set from this dialog)
+                record = self._current(record)
+                # Green (2) or Yellow (1) -> Skip (User requirement: "If Status is Green... SKIP", "If Status is Yellow... SKIP")
+                # Only process if Red (0)
+                if record is not None and record.cover_status == 0:
+                    missing.append(record)
+            
+            def progress(done, total):
+                self.after(0, lambda: self.status_label.configure(text=f"Fetching covers... album {done}/{total}"))
+            
+            # One lookup and download per album, embedded into each of its tracks
+            from core.covers import AlbumCoverPipeline
+            pipeline = AlbumCoverPipeline(self.audio_handler, self.metadata_handler)
+            modified_paths, found, albums = pipeline.run(missing, progress, cancelled)
+            
+            message = f"Fetched covers for {found} of {albums} albums ({len(modified_paths)} files)."
+            if cancelled.is_set():
+                message = "Cancelled. " + message
+            message += self._rewrite_note(before)
+            self.after(0, lambda: self._on_complete(message, modified_paths))
             
         t = threading.Thread(target=worker)
         t.daemon = True
@@ -163,23 +193,17 @@ class BatchEditDialog(tk.Toplevel):
         self.status_label.configure(text="Resizing covers...")
         
         def worker():
+            before = self.audio_handler.write_stats()
             count = 0
             modified_paths = []
-            for path in self.file_paths:
-                # Optimization: Check cached status first
-                status = self.status_map.get(path)
-                if status:
-                    c_stat = status[0]
-                    # Green (2) -> Skip
-                    # Red (0) -> Skip
-                    # Yellow (1) -> Process
-                    if c_stat != 1:
-                        continue
-                else:
-                    # Fallback
-                    tags = self.audio_handler.get_tags(path)
-                    c_stat = tags.get('cover_status', 0)
-                    if c_stat == 2: continue # Already 500x500
+            for record in self.records:
+                path = record.path
+                record = self._current(record)
+                # Green (2) -> Skip
+                # Red (0) -> Skip
+                # Yellow (1) -> Process
+                if record is None or record.cover_status != 1:
+                    continue
                     
                 data = self.audio_handler.get_cover(path)
                 if data:
@@ -195,18 +219,23 @@ class BatchEditDialog(tk.Toplevel):
                         if self.audio_handler.set_cover(path, new_data):
                             count += 1
                             modified_paths.append(path)
-                            # Update status map
-                            self.status_map[path] = (2, self.status_map.get(path, (0,0))[1])
                     except Exception:
                         pass
                         
-            self.after(0, lambda: self._on_complete(f"Resized {count} covers.", modified_paths))
+            message = f"Resized {count} covers." + self._rewrite_note(before)
+            self.after(0, lambda: self._on_complete(message, modified_paths))
             
         t = threading.Thread(target=worker)
         t.daemon = True
         t.start()
         
+    def _rewrite_note(self, before):
+        # Saves that outgrew the tag padding and had to rewrite the whole file
+        rewrites = self.audio_handler.write_stats()[1] - before[1]
+        return f" ({rewrites} full rewrites)" if rewrites else ""
+
     def _on_complete(self, message, modified_paths=None):
+        self.cover_cancel = None
         self.status_label.configure(text=message)
         if self.on_update:
             self.on_update(modified_paths) # Trigger refresh in parent
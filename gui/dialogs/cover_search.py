@@ -11,6 +11,8 @@ class CoverSearchDialog(tk.Toplevel):
         self.geometry("900x600") # Wider for split view
         self.configure(bg='#1e1e1e')
         self.on_apply = on_apply
+        from core.metadata import MetadataHandler
+        self.metadata_handler = MetadataHandler() # Shares the process-wide HTTP pool
         
         # Make modal
         self.transient(parent)
@@ -98,8 +100,7 @@ class CoverSearchDialog(tk.Toplevel):
         t.start()
         
     def _search_worker(self, artist, album):
-        from core.metadata import MetadataHandler
-        handler = MetadataHandler()
+        handler = self.metadata_handler
         results = handler.search_releases(artist, album)
         self.after(0, lambda: self._update_list(results))
         
@@ -143,8 +144,7 @@ class CoverSearchDialog(tk.Toplevel):
             t.start()
             
     def _preview_worker(self, mbid, request_id):
-        from core.metadata import MetadataHandler
-        handler = MetadataHandler()
+        handler = self.metadata_handler
         data = handler.get_cover_bytes(mbid)
         self.after(0, lambda: self._update_preview(data, request_id))
         
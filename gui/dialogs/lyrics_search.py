@@ -9,6 +9,8 @@ class LyricsSearchDialog(tk.Toplevel):
         self.geometry("800x600")
         self.configure(bg='#1e1e1e')
         self.on_apply = on_apply
+        from core.metadata import MetadataHandler
+        self.metadata_handler = MetadataHandler() # Shares the process-wide HTTP pool
         
         # Make modal
         self.transient(parent)
@@ -107,8 +109,7 @@ class LyricsSearchDialog(tk.Toplevel):
         t.start()
         
     def _search_worker(self, artist, title, album):
-        from core.metadata import MetadataHandler
-        handler = MetadataHandler()
+        handler = self.metadata_handler
         results = handler.search_lyrics(artist, title, album)
         self.after(0, lambda: self._update_list(results))
         
@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk
+from tkinter import font as tkfont
 import os # Added for os.path.basename
 
 class TrackTable(ttk.Frame):
@@ -67,10 +68,21 @@ class TrackTable(ttk.Frame):
 
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
+        # Virtual mode keeps every row in the model (rows/records) but only
+        # materializes the ones in the viewport plus a small overscan
+        from core.config import ConfigManager
+        config = ConfigManager()
+        self.virtual = config.get("table", "virtual", True)
+        self.overscan = config.get("table", "overscan", 10)
+
         # Vertical scrollbar
-        scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.tree.yview)
+        if self.virtual:
+            scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        else:
+            scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.tree.yview)
+            self.tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.vsb = scrollbar
 
         # Horizontal scrollbar
         hsb = ttk.Scrollbar(self.frame, orient="horizontal", command=self.tree.xview)
@@ -80,9 +92,18 @@ class TrackTable(ttk.Frame):
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1) # Make row 1 (for the table) expandable
 
-        self.icon_cache = [] # Keep references to PhotoImage objects to prevent garbage collection
-        self.item_paths = {} # Store full paths for items
-        self.item_status = {} # Store (cover_status, lyrics_status)
+        self.rows = [] # item ids in display order (materialized or not)
+        self.row_index = {} # item id -> index in rows, kept in step with it
+        self.records = {} # item id -> TrackRecord (path, tags and status for each row)
+        self.path_items = {} # path -> item id, reverse of records for O(1) row lookups
+        self.loading = set() # item ids showing the loading badge
+        self._next_id = 0
+        
+        # Virtual viewport state
+        self._top = 0 # model index of the first visible row
+        self._window = [] # item ids currently inserted in the Treeview, in order
+        self._selected = None # selected item id, kept while it is scrolled out
+        self._render_pending = False
 
         # Settings Button
         settings_button = ttk.Button(self, text="Settings", command=self.show_settings)
@@ -99,6 +120,19 @@ class TrackTable(ttk.Frame):
         # Converter removed as requested
         
         self.tree.bind("<Button-3>", self.show_menu)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        
+        if self.virtual:
+            self.tree.bind("<Configure>", lambda e: self._schedule_render())
+            self.tree.bind("<MouseWheel>", self._on_mousewheel)
+            self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+            self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+            self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+            self.tree.bind("<Down>", lambda e: self._move_selection(1))
+            self.tree.bind("<Prior>", lambda e: self._move_selection(-self._page_size()))
+            self.tree.bind("<Next>", lambda e: self._move_selection(self._page_size()))
+            self.tree.bind("<Home>", lambda e: self._move_selection(-len(self.rows)))
+            self.tree.bind("<End>", lambda e: self._move_selection(len(self.rows)))
         
         # Apply initial settings
         self.apply_settings()
@@ -140,38 +174,29 @@ class TrackTable(ttk.Frame):
             self.menu.post(event.x_root, event.y_root)
 
     def open_batch_editor(self):
-        items = self.tree.get_children()
+        items = list(self.rows)
         if not items:
             print("No files to edit")
             return
             
-        file_paths = []
-        status_map = {}
-        for item in items:
-            path = self.item_paths.get(item)
-            status = self.item_status.get(item)
-            if path:
-                file_paths.append(path)
-                if status:
-                    status_map[path] = status
-                
-        if not file_paths: return
+        # The dialog works from the scanned records and only re-reads files changed since
+        records = [self.records[item] for item in items if item in self.records]
+        if not records: return
         
         from gui.dialogs.batch_edit import BatchEditDialog
-        BatchEditDialog(self.winfo_toplevel(), file_paths, status_map=status_map, on_update=self.on_batch_update)
+        BatchEditDialog(self.winfo_toplevel(), records, on_update=self.on_batch_update)
 
     def on_batch_update(self, modified_paths=None):
         if modified_paths:
             print(f"Batch update: Refreshing {len(modified_paths)} rows...")
-            for path in modified_paths:
-                self.refresh_row(path)
-        else:
+            self.refresh_rows(modified_paths)
+        elif modified_paths is None:
             # Fallback to full refresh
             if self.refresh_callback:
                 self.refresh_callback()
 
     def mass_lyrics_fetch(self):
-        items = self.tree.get_children()
+        items = self.rows
         if not items:
             print("No files to process")
             return
@@ -180,7 +205,7 @@ class TrackTable(ttk.Frame):
         LyricsDownloadDialog(self.winfo_toplevel(), self._start_mass_fetch)
 
     def _start_mass_fetch(self, options):
-        items = self.tree.get_children()
+        items = list(self.rows)
         
         # Find button first
         self.fetch_btn = None
@@ -194,17 +219,11 @@ class TrackTable(ttk.Frame):
         skipped_count = 0
         
         for item in items:
-            path = self.item_paths.get(item)
-            status = self.item_status.get(item)
-            
-            if not path: continue
-            
-            if not status:
-                # Fallback if no status, process it
-                file_paths.append(path)
-                continue
+            record = self.records.get(item)
+            if not record: continue
+            path = record.path
                 
-            l_stat = status[1] # 0=Red, 1=Yellow, 2=Green
+            l_stat = record.lyrics_status # 0=Red, 1=Yellow, 2=Green
             
             should_process = False
             if l_stat == 0: # Red (Missing)
@@ -270,14 +289,17 @@ class TrackTable(ttk.Frame):
         proc = BatchLyricsProcessor()
         
         def progress(processed, total, filepath, status):
-            self.after(0, lambda: self._on_batch_progress(processed, total, filepath, status))
+            load = proc.controller.describe()
+            self.after(0, lambda: self._on_batch_progress(processed, total, filepath, status, load))
             
         proc.process_library(file_paths, progress, **options)
         
         self.after(0, lambda: self._on_batch_complete(len(file_paths)))
+        saves, rewrites = proc.audio_handler.write_stats()
+        message = f"Mass fetch complete: {saves} files written, {rewrites} needed a full rewrite"
         if self.log_callback:
-            self.after(0, lambda: self.log_callback("Mass fetch complete"))
-        print("Mass fetch complete")
+            self.after(0, lambda: self.log_callback(message))
+        print(message)
 
     def _on_batch_complete(self, count):
         if self.fetch_btn:
@@ -286,12 +308,14 @@ class TrackTable(ttk.Frame):
         from gui.dialogs.batch_results import BatchResultsDialog
         BatchResultsDialog(self.winfo_toplevel(), self.batch_stats, self.batch_failures)
 
-    def _on_batch_progress(self, processed, total, filepath, status):
+    def _on_batch_progress(self, processed, total, filepath, status, load=None):
         # Update button text
         if self.fetch_btn:
             self.fetch_btn.configure(text=f"Fetching: {processed}/{total}")
             
         msg = f"[{processed}/{total}] {status}: {os.path.basename(filepath)}"
+        if load:
+            msg += f" ({load})"
         print(msg)
         if self.log_callback:
             self.log_callback(msg)
@@ -318,58 +342,92 @@ class TrackTable(ttk.Frame):
             })
 
     def _set_loading_icons(self, items):
-        from core.icons import create_status_icon
+        from core.icons import get_status_icon
         for item in items:
-            status = self.item_status.get(item)
-            if status:
-                cover_stat, lyrics_stat = status
+            record = self.records.get(item)
+            if record:
+                cover_stat, lyrics_stat = record.status
                 # Only set loading if not already synced
                 if lyrics_stat != 2:
-                    icon = create_status_icon(cover_stat, lyrics_stat, is_loading=True)
-                    self.tree.item(item, image=icon)
-                    self.icon_cache.append(icon)
+                    self.loading.add(item)
+                    if self.tree.exists(item):
+                        icon = get_status_icon(cover_stat, lyrics_stat, is_loading=True)
+                        self.tree.item(item, image=icon)
 
 
     def refresh_row(self, filepath):
-        # Find item
-        target_item = None
-        for item, path in self.item_paths.items():
-            if path == filepath:
-                target_item = item
-                break
+        self.refresh_rows([filepath])
+
+    def refresh_rows(self, filepaths):
+        # Re-read tags to get fresh status; rows are found through path_items in O(1)
+        from core.audio import AudioHandler
+        handler = None
         
-        if target_item and self.tree.exists(target_item):
-            # Re-read tags to get fresh status
-            from core.audio import AudioHandler
-            from core.icons import create_status_icon
-            handler = AudioHandler()
+        for filepath in filepaths:
+            if filepath not in self.path_items:
+                continue
+            
+            if handler is None:
+                handler = AudioHandler()
             tags = handler.get_tags(filepath)
-            if tags:
-                c_stat = tags.get('cover_status', 0)
-                l_stat = tags.get('lyrics_status', 0)
-                icon = create_status_icon(c_stat, l_stat)
-                
-                # Update Values
-                values = (
-                    os.path.basename(filepath), # Filename
-                    tags.get("title", ""),
-                    tags.get("artist", ""),
-                    tags.get("album", ""),
-                    tags.get("albumartist", ""),
-                    tags.get("year", ""),
-                    tags.get("genre", "")
-                )
-                
-                # Update #0 text to empty (icon only)
-                self.tree.item(target_item, text="", image=icon, values=values)
-                
-                # Update cache and status
-                self.icon_cache.append(icon)
-                self.item_status[target_item] = (c_stat, l_stat)
-                
-                # Notify app of update (to refresh editor if needed)
-                if self.on_track_updated:
-                    self.on_track_updated(filepath)
+            if not tags: continue
+            
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                st = None
+            self.update_track(tags, st)
+            
+            # Notify app of update (to refresh editor if needed)
+            if self.on_track_updated:
+                self.on_track_updated(filepath)
+
+    def update_track(self, tags, st=None):
+        """Apply freshly read tags to the row for tags["path"], adding it if missing."""
+        item = self.path_items.get(tags["path"])
+        if item is None:
+            from core.track import TrackRecord
+            return self.add_tracks([TrackRecord.from_tags(tags, st)])[0]
+        
+        # Update in place so the editor keeps pointing at the same record
+        self.records[item].update(tags, st)
+        self._redraw(item)
+        return item
+
+    def _redraw(self, item):
+        from core.icons import get_status_icon
+        self.loading.discard(item)
+        
+        # Rows scrolled out of a virtual table pick the new values up when materialized
+        if self.tree.exists(item):
+            record = self.records[item]
+            icon = get_status_icon(record.cover_status, record.lyrics_status)
+            # Update #0 text to empty (icon only)
+            self.tree.item(item, text="", image=icon, values=record.row_values())
+
+    def remove_tracks(self, filepaths):
+        removed = set()
+        for path in filepaths:
+            item = self.path_items.pop(path, None)
+            if item is None: continue
+            removed.add(item)
+            del self.records[item]
+            self.loading.discard(item)
+        if not removed: return
+        
+        self.rows = [item for item in self.rows if item not in removed]
+        self.row_index = {item: i for i, item in enumerate(self.rows)}
+        if self._selected in removed:
+            self._selected = None
+        
+        if self.virtual:
+            # Re-materialize the whole window so zebra striping follows the new indices
+            if self._window:
+                self.tree.delete(*self._window)
+            self._window = []
+            self._render_window()
+        else:
+            self.tree.delete(*[item for item in removed if self.tree.exists(item)])
 
     def convert_selected(self, fmt):
         selection = self.tree.selection()
@@ -377,10 +435,9 @@ class TrackTable(ttk.Frame):
         
         files = []
         for item in selection:
-            # Retrieve the full path from the stored item_paths dictionary
-            path = self.item_paths.get(item)
-            if path:
-                files.append(path)
+            record = self.records.get(item)
+            if record:
+                files.append(record.path)
         
         if not files: return
         
@@ -393,34 +450,191 @@ class TrackTable(ttk.Frame):
         
         print(f"Converted {len(files)} files to {fmt}")
 
-    def add_track(self, tags):
-        from core.icons import create_status_icon
-        c_stat = tags.get('cover_status', 0)
-        l_stat = tags.get('lyrics_status', 0)
-        icon = create_status_icon(c_stat, l_stat)
-        self.icon_cache.append(icon)
-        
-        values = (
-            os.path.basename(tags["path"]), # Filename
-            tags.get("title", ""),
-            tags.get("artist", ""),
-            tags.get("album", ""),
-            tags.get("albumartist", ""),
-            tags.get("year", ""),
-            tags.get("genre", "")
-        )
-        # Zebra Striping
-        idx = len(self.tree.get_children())
-        tag = 'even' if idx % 2 == 0 else 'odd'
+    def add_track(self, record):
+        return self.add_tracks([record])[0]
+
+    def add_tracks(self, records):
+        items = []
+        for record in records:
+            item = self.path_items.get(record.path)
+            if item is not None:
+                # Already listed (e.g. the watcher saw it before the scan got there)
+                self.records[item].copy_from(record)
+                self._redraw(item)
+                items.append(item)
+                continue
+            self._next_id += 1
+            item = f"t{self._next_id}"
+            self.row_index[item] = len(self.rows)
+            self.rows.append(item)
+            self.records[item] = record
+            self.path_items[record.path] = item
+            items.append(item)
+            if not self.virtual:
+                self._insert_row(item, len(self.rows) - 1, "end")
+        
+        if self.virtual:
+            # One viewport update per batch, however many rows arrived
+            self._schedule_render()
+        return items
+
+    def _insert_row(self, item, index, position):
+        from core.icons import get_status_icon
+        record = self.records[item]
+        icon = get_status_icon(record.cover_status, record.lyrics_status, is_loading=item in self.loading)
+        
+        # Zebra Striping (by model index, so it stays stable while scrolling)
+        tag = 'even' if index % 2 == 0 else 'odd'
         
         # Use text="" for column #0 (icon only)
-        item = self.tree.insert("", "end", text="", image=icon, values=values, tags=(tag,))
-        self.item_paths[item] = tags["path"] # Store path
-        self.item_status[item] = (c_stat, l_stat) # Store status
-        return item
+        self.tree.insert("", position, iid=item, text="", image=icon, values=record.row_values(), tags=(tag,))
+
+    def find_item(self, filepath):
+        return self.path_items.get(filepath)
+
+    def neighbors(self, item, radius):
+        """Records within radius rows of item, nearest first (next before previous)."""
+        index = self.row_index.get(item)
+        if index is None:
+            return []
+        result = []
+        for offset in range(1, radius + 1):
+            for i in (index + offset, index - offset):
+                if 0 <= i < len(self.rows):
+                    result.append(self.records[self.rows[i]])
+        return result
 
     def clear(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        self.item_paths.clear()
-        self.item_status.clear()
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.rows = []
+        self.row_index.clear()
+        self.records.clear()
+        self.path_items.clear()
+        self.loading.clear()
+        self._top = 0
+        self._window = []
+        self._selected = None
+        if self.virtual:
+            self._update_scrollbar()
+
+    # --- Virtual scrolling ---
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self._selected = selection[0]
+
+    def _row_height(self):
+        try:
+            return int(ttk.Style().lookup("Treeview", "rowheight")) or 20
+        except (ValueError, tk.TclError):
+            return 20
+
+    def _page_size(self):
+        # Fully visible rows in the viewport
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return 30 # Not mapped yet
+        return max(1, (height - self._heading_height()) // self._row_height())
+
+    def _heading_height(self):
+        # Where the first row is drawn, once there is one; else the heading font plus padding
+        if self._window:
+            bbox = self.tree.bbox(self._window[0])
+            if bbox:
+                return bbox[1]
+        try:
+            font = ttk.Style().lookup("Treeview.Heading", "font") or "TkHeadingFont"
+            return tkfont.Font(font=font).metrics("linespace") + 8
+        except tk.TclError:
+            return 25
+
+    def _schedule_render(self):
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render_window)
+
+    def _render_window(self):
+        self._render_pending = False
+        if not self.virtual: return
+        
+        n = len(self.rows)
+        page = self._page_size()
+        self._top = max(0, min(self._top, n - page))
+        start = self._top
+        end = min(n, start + page + self.overscan)
+        new_window = self.rows[start:end]
+        
+        # Reuse items that stay in view, drop the rest, insert the newcomers in place
+        keep = set(new_window)
+        stale = [item for item in self._window if item not in keep]
+        if stale:
+            self.tree.delete(*stale)
+        present = set(self._window).difference(stale)
+        for pos, item in enumerate(new_window):
+            if item not in present:
+                self._insert_row(item, start + pos, pos)
+        self._window = new_window
+        
+        # The Treeview itself never scrolls; the model offset does
+        self.tree.yview_moveto(0)
+        
+        if self._selected in keep and self._selected not in self.tree.selection():
+            self.tree.selection_set(self._selected)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        n = len(self.rows)
+        if n == 0:
+            self.vsb.set(0.0, 1.0)
+            return
+        page = self._page_size()
+        self.vsb.set(self._top / n, min(1.0, (self._top + page) / n))
+
+    def _scroll_to(self, top):
+        top = max(0, min(int(top), len(self.rows) - self._page_size()))
+        if top != self._top:
+            self._top = top
+            self._render_window()
+
+    def _scroll_by(self, delta):
+        self._scroll_to(self._top + delta)
+        return "break"
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        step = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        return self._scroll_by(step * 3)
+
+    def _on_scrollbar(self, *args):
+        if not args: return
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self._page_size()
+            self._scroll_by(amount)
+
+    def _move_selection(self, delta):
+        if not self.rows:
+            return "break"
+        
+        index = self.row_index.get(self._selected, -1)
+        index = max(0, min(len(self.rows) - 1, index + delta))
+        
+        # Bring the row into view before selecting it
+        page = self._page_size()
+        if index < self._top:
+            self._scroll_to(index)
+        elif index >= self._top + page:
+            self._scroll_to(index - page + 1)
+        
+        self._selected = self.rows[index]
+        if not self.tree.exists(self._selected):
+            self._render_window()
+        self.tree.selection_set(self._selected)
+        self.tree.focus(self._selected)
+        return "break"
@@ -2,8 +2,11 @@ import tkinter as tk
 from tkinter import ttk
 import os
 
+# Child folders inserted per Tk tick when filling a node
+FILL_CHUNK = 200
+
 class BrowserTab(ttk.Frame):
-    def __init__(self, parent, on_folder_selected):
+    def __init__(self, parent, on_folder_selected, index=None):
         super().__init__(parent)
         self.on_folder_selected = on_folder_selected
         self.pack(fill=tk.BOTH, expand=True)
@@ -22,9 +25,13 @@ class BrowserTab(ttk.Frame):
         ttk.Button(ctrl_frame, text="Refresh", command=self.refresh).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2)
         ttk.Button(ctrl_frame, text="Change Root", command=self.change_root).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2)
         
-        self.tree = ttk.Treeview(self.browser_frame)
+        self.tree = ttk.Treeview(self.browser_frame, columns=("info",))
         self.tree.pack(fill=tk.BOTH, expand=True)
         self.tree.heading("#0", text="Folders", anchor="w")
+        # "tracks | C:missing covers L:missing lyrics" from the index, else the audio file count;
+        # both count the whole subtree, however the node was reached
+        self.tree.heading("info", text="Tracks", anchor="e")
+        self.tree.column("info", width=90, minwidth=50, stretch=False, anchor="e")
         
         # --- Bottom Section: Log Console ---
         self.log_frame = ttk.Frame(self.paned)
@@ -55,7 +62,15 @@ class BrowserTab(ttk.Frame):
         self.console.tag_config("timestamp", foreground="#888888")
         
         self.nodes = {}
+        self.path_nodes = {} # path -> node
+        self._loaded = set() # Nodes whose children are all inserted
+        self._awaiting = set() # Nodes waiting for a listing to fill them
+        self._fill_tokens = {} # node -> Listing being inserted in chunks
+        self._expand_target = None
         self.current_root = None
+        
+        from core.dirlister import FolderLister
+        self.lister = FolderLister(self, self._on_listing, index)
         self.populate_root()
         
         self.tree.bind("<<TreeviewOpen>>", self.on_open)
@@ -93,6 +108,7 @@ class BrowserTab(ttk.Frame):
         node = self.tree.focus()
         path = self.nodes.get(node)
         if path:
+            self.lister.invalidate(path)
             self.populate_node(node, path)
 
     def change_root(self):
@@ -123,76 +139,162 @@ class BrowserTab(ttk.Frame):
                 self.on_folder_selected(self.current_root)
 
     def _expand_to_path(self, target_path):
-        # Break path into components relative to root
+        # Children are listed in the background, so walk down as far as is
+        # loaded; _fill_chunk resumes the walk when the next level arrives.
+        self._expand_target = target_path
+        self._continue_expand()
+
+    def _continue_expand(self):
+        target = self._expand_target
+        node = self.path_nodes.get(self.current_root)
+        if not target or node is None: return
         try:
-            rel = os.path.relpath(target_path, self.current_root)
-            if rel == '.': return
-            
-            parts = rel.split(os.sep)
-            current_node = None
-            
-            # Find root node
-            for item in self.tree.get_children():
-                if self.nodes.get(item) == self.current_root:
-                    current_node = item
-                    break
-            
-            if not current_node: return
+            rel = os.path.relpath(target, self.current_root)
+            if rel == '.':
+                self._expand_target = None
+                return
             
-            # Walk down
-            for part in parts:
-                # Ensure children are loaded
-                self.populate_node(current_node, self.nodes[current_node])
-                self.tree.item(current_node, open=True)
+            path = self.current_root
+            for part in rel.split(os.sep):
+                self.tree.item(node, open=True)
+                if node not in self._loaded:
+                    if node not in self._fill_tokens and node not in self._awaiting:
+                        self.populate_node(node, path)
+                    return
                 
-                # Find next node
-                found = False
-                for child in self.tree.get_children(current_node):
-                    if self.tree.item(child, "text") == part:
-                        current_node = child
-                        found = True
-                        break
-                
-                if not found: return
+                path = os.path.join(path, part)
+                node = self.path_nodes.get(path)
+                if node is None:
+                    self._expand_target = None
+                    return
             
             # Select final node
-            self.tree.selection_set(current_node)
-            self.tree.see(current_node)
+            self._expand_target = None
+            self.tree.selection_set(node)
+            self.tree.see(node)
         except Exception as e:
+            self._expand_target = None
             print(f"Error restoring selection: {e}")
 
     def set_root(self, path):
         self.current_root = path
+        self.lister.invalidate()
         self.tree.delete(*self.tree.get_children())
         self.nodes = {}
+        self.path_nodes = {}
+        self._loaded.clear()
+        self._awaiting.clear()
+        self._fill_tokens.clear()
+        self._expand_target = None
         
         node = self.tree.insert("", "end", text=os.path.basename(path), open=True)
         self.nodes[node] = path
+        self.path_nodes[path] = node
+        self.tree.insert(node, "end", text="Loading...")
         self.populate_node(node, path)
 
     def populate_root(self):
         # Deprecated, use set_root
         pass
 
+    def update_counts(self, path):
+        """Re-read the counts shown for path, its parents and its subfolders."""
+        prefix = os.path.join(path, "")
+        for known in list(self.path_nodes):
+            if known == path or known.startswith(prefix) or prefix.startswith(os.path.join(known, "")):
+                # A change deep down leaves known's mtime alone, so drop its cached subtree count
+                self.lister.invalidate(known)
+                self.lister.request(known, prefetch=True)
+
     def on_open(self, event):
         node = self.tree.focus()
         path = self.nodes.get(node)
-        if path:
+        if not path: return
+        if node in self._loaded or node in self._fill_tokens:
+            self.lister.request(path) # Already shown; refilled only if it changed on disk
+        else:
             self.populate_node(node, path)
 
     def populate_node(self, parent, path):
-        self.tree.delete(*self.tree.get_children(parent)) # Keep this line to clear existing children
-        try:
-            for item in sorted(os.listdir(path)):
-                if item.startswith('.'): continue
-                
-                fullpath = os.path.join(path, item)
-                if os.path.isdir(fullpath):
-                    node = self.tree.insert(parent, "end", text=item, open=False)
-                    self.nodes[node] = fullpath
-                    self.tree.insert(node, "end", text="Loading...")
-        except OSError: # Changed from PermissionError to OSError as per instruction's snippet
-            pass
+        listing = self.lister.request(path)
+        if listing is not None:
+            self._fill_node(parent, listing)
+        else:
+            # Keep the current children (or placeholder) until the listing arrives
+            self._awaiting.add(parent)
+
+    def _on_listing(self, listing, prefetch):
+        node = self.path_nodes.get(listing.path)
+        if node is None or not self.tree.exists(node): return
+        self.tree.set(node, "info", self._info(listing))
+        
+        subpaths = [p for _, p in listing.subdirs]
+        filling = self._fill_tokens.get(node)
+        if node in self._awaiting:
+            self._fill_node(node, listing)
+        elif filling is not None:
+            if [p for _, p in filling.subdirs] != subpaths:
+                self._fill_node(node, listing)
+        elif node in self._loaded:
+            if [self.nodes.get(c) for c in self.tree.get_children(node)] != subpaths:
+                self._fill_node(node, listing) # Changed on disk since the cached listing
+        elif bool(self.tree.get_children(node)) != bool(subpaths):
+            # Not expanded yet: only show an expander when there is something inside
+            if subpaths:
+                self.tree.insert(node, "end", text="Loading...")
+            else:
+                self.tree.delete(*self.tree.get_children(node))
+
+    def _fill_node(self, node, listing):
+        self._awaiting.discard(node)
+        self._loaded.discard(node)
+        for child in self.tree.get_children(node):
+            self._forget(child)
+        self.tree.delete(*self.tree.get_children(node))
+        self._fill_tokens[node] = listing
+        self._fill_chunk(node, listing, 0)
+
+    def _fill_chunk(self, node, listing, start):
+        if self._fill_tokens.get(node) is not listing or not self.tree.exists(node):
+            return # Superseded by a newer listing, or the tree was reset
+        end = start + FILL_CHUNK
+        for name, path in listing.subdirs[start:end]:
+            self._add_node(node, name, path)
+        if end < len(listing.subdirs):
+            self.after(1, lambda: self._fill_chunk(node, listing, end))
+            return
+        
+        del self._fill_tokens[node]
+        self._loaded.add(node)
+        if self._expand_target:
+            self._continue_expand()
+
+    def _add_node(self, parent, name, path):
+        # A prefetched listing gives the counts now and tells us whether to show an expander
+        listing = self.lister.cached(path)
+        node = self.tree.insert(parent, "end", text=name, open=False, values=(self._info(listing),))
+        self.nodes[node] = path
+        self.path_nodes[path] = node
+        if listing is None or listing.subdirs:
+            self.tree.insert(node, "end", text="Loading...")
+        return node
+
+    def _forget(self, node):
+        for child in self.tree.get_children(node):
+            self._forget(child)
+        path = self.nodes.pop(node, None)
+        if path is not None and self.path_nodes.get(path) == node:
+            del self.path_nodes[path]
+        self._loaded.discard(node)
+        self._awaiting.discard(node)
+        self._fill_tokens.pop(node, None)
+
+    def _info(self, listing):
+        if listing is None: return ""
+        if listing.stats and listing.stats[0]:
+            tracks, no_cover, no_lyrics = listing.stats
+            return f"{tracks} | C:{no_cover} L:{no_lyrics}"
+        return str(listing.audio_count) if listing.audio_count else ""
 
     def on_select(self, event):
         if self.on_folder_selected:
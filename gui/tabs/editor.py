@@ -3,6 +3,8 @@ from tkinter import ttk
 from PIL import Image, ImageTk
 import io
 
+from core.cache import LRUCache
+
 class EditorTab(ttk.Frame):
     def __init__(self, parent, on_save=None, audio_handler=None):
         super().__init__(parent)
@@ -73,36 +75,61 @@ class EditorTab(ttk.Frame):
         self.lyrics_text.pack(fill=tk.BOTH, expand=True)
         
         self.current_track = None
+        # Lyrics text is not part of the scanned records; keep the last few shown
+        self.lyrics_cache = LRUCache(32)
+        self.thumbnails = None
+        if audio_handler:
+            from core.thumbnails import ThumbnailService
+            self.thumbnails = ThumbnailService(self, audio_handler)
 
-    def load_track(self, track_data):
-        self.current_track = track_data
+    def load_track(self, track):
+        # track is the table's TrackRecord for the selected row
+        self.current_track = track
         
-        # Update Cover
-        if self.audio_handler:
-            data = self.audio_handler.get_cover(track_data["path"])
-            if data:
-                try:
-                    img = Image.open(io.BytesIO(data))
-                    self.resolution_label.configure(text=f"{img.width}x{img.height}")
-                    img.thumbnail((200, 200))
-                    photo = ImageTk.PhotoImage(img)
-                    self.cover_label.configure(image=photo, text="")
-                    self.cover_label.image = photo
-                except Exception:
-                    self.cover_label.configure(image="", text="[Error]")
-                    self.resolution_label.configure(text="")
-            else:
-                self.cover_label.configure(image="", text="[No Cover]")
-                self.resolution_label.configure(text="")
+        # Update Cover (decoded off-thread; memory cache hits come back immediately)
+        if self.thumbnails:
+            self.cover_label.configure(image="", text="[Loading...]")
+            self.resolution_label.configure(text="")
+            self.cover_label.image = None
+            self.thumbnails.request(track.path, track.mtime_ns, self._show_thumbnail)
             
         # Update Entries
         for key, entry in self.entries.items():
             entry.delete(0, tk.END)
-            entry.insert(0, track_data.get(key, ""))
+            entry.insert(0, getattr(track, key, ""))
             
         # Update Lyrics
         self.lyrics_text.delete("1.0", tk.END)
-        self.lyrics_text.insert("1.0", track_data.get("lyrics", ""))
+        self.lyrics_text.insert("1.0", self._get_lyrics(track))
+
+    def warm_track(self, track):
+        # Runs on the prefetch thread: fill the caches load_track reads from
+        if self.thumbnails:
+            self.thumbnails.get(track.path, track.mtime_ns)
+        self._get_lyrics(track)
+
+    def _get_lyrics(self, track):
+        if not track.lyrics_status or not self.audio_handler:
+            return ""
+        key = (track.path, track.mtime_ns) # A save changes mtime_ns, so edits are never served stale
+        lyrics = self.lyrics_cache.get(key)
+        if lyrics is None:
+            lyrics = self.audio_handler.get_lyrics(track.path)
+            self.lyrics_cache.put(key, lyrics)
+        return lyrics
+
+    def _show_thumbnail(self, thumb):
+        if thumb is None:
+            self.cover_label.configure(image="", text="[No Cover]")
+            self.resolution_label.configure(text="")
+        elif thumb.image is None:
+            self.cover_label.configure(image="", text="[Error]")
+            self.resolution_label.configure(text="")
+        else:
+            photo = ImageTk.PhotoImage(thumb.image)
+            self.cover_label.configure(image=photo, text="")
+            self.cover_label.image = photo
+            self.resolution_label.configure(text=f"{thumb.width}x{thumb.height}")
 
     def save_tags(self):
         if not self.current_track: return
@@ -117,7 +144,7 @@ class EditorTab(ttk.Frame):
         def worker():
             success = False
             if self.on_save:
-                success = self.on_save(self.current_track["path"], new_tags)
+                success = self.on_save(self.current_track.path, new_tags)
             self.after(0, lambda: self._on_save_complete(success))
             
         t = threading.Thread(target=worker)
@@ -126,7 +153,10 @@ class EditorTab(ttk.Frame):
 
     def _on_save_complete(self, success):
         self.save_btn.configure(state="normal", text="Apply Changes")
-        if success:
+        from core.audio import UNCHANGED
+        if success == UNCHANGED:
+            self.show_toast("No Changes to Save")
+        elif success:
             self.show_toast("Tags Saved Successfully")
         else:
             self.show_toast("Save Failed")
@@ -160,7 +190,7 @@ class EditorTab(ttk.Frame):
         CoverSearchDialog(self.winfo_toplevel(), artist, album, self._on_cover_selected)
 
     def _on_cover_selected(self, data):
-        if self.audio_handler.set_cover(self.current_track["path"], data):
+        if self.audio_handler.set_cover(self.current_track.path, data):
             try:
                 img = Image.open(io.BytesIO(data))
                 self.resolution_label.configure(text=f"{img.width}x{img.height}")
@@ -172,7 +202,7 @@ class EditorTab(ttk.Frame):
                 
                 # Notify parent to refresh the specific row
                 if self.on_save:
-                    self.on_save(self.current_track["path"], None)
+                    self.on_save(self.current_track.path, None)
             except Exception:
                 pass
 
@@ -189,13 +219,9 @@ class EditorTab(ttk.Frame):
         def worker():
             from core.metadata import MetadataHandler
             handler = MetadataHandler()
-            path = handler.fetch_cover(artist, album)
-            if path:
-                with open(path, 'rb') as f:
-                    data = f.read()
+            data = handler.fetch_cover_bytes(artist, album)
+            if data:
                 self.after(0, lambda: self._on_cover_selected(data))
-                import os
-                os.unlink(path) # Cleanup temp file
             else:
                 self.after(0, lambda: self.show_toast("Cover Not Found"))
                 
@@ -210,7 +236,7 @@ class EditorTab(ttk.Frame):
         if path:
             with open(path, 'rb') as f:
                 data = f.read()
-            if self.audio_handler.set_cover(self.current_track["path"], data):
+            if self.audio_handler.set_cover(self.current_track.path, data):
                 self.update_cover_display(path)
 
     def resize_cover(self):
@@ -221,7 +247,7 @@ class EditorTab(ttk.Frame):
         import threading
         def worker():
             # Get current cover data from audio handler
-            data = self.audio_handler.get_cover(self.current_track["path"])
+            data = self.audio_handler.get_cover(self.current_track.path)
             if data:
                 try:
                     img = Image.open(io.BytesIO(data))
@@ -232,7 +258,7 @@ class EditorTab(ttk.Frame):
                     img.save(out, format="JPEG", quality=90)
                     new_data = out.getvalue()
                     
-                    if self.audio_handler.set_cover(self.current_track["path"], new_data):
+                    if self.audio_handler.set_cover(self.current_track.path, new_data):
                         self.after(0, lambda: self._on_resize_complete(img))
                 except Exception as e:
                     print(f"Resize error: {e}")
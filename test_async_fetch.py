@@ -0,0 +1,190 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import http.server
+import socketserver
+import urllib.parse
+
+# Add the project root to sys.path
+sys.path.append(os.getcwd())
+
+from core.config import ConfigManager
+from core.http_client import get_client
+from core.http_cache import ResponseCache
+from core.batch_lyrics import BatchLyricsProcessor
+from core.covers import AlbumCoverPipeline
+from core.metadata import MetadataHandler
+
+class FakeServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """Fake lrclib (/api/get) and iTunes (/search, /art) over keep-alive HTTP/1.1."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.statuses = []
+        self.chunked = 0
+        self.busy_seen = set()
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+class FakeHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=b"", headers=None, chunked=False):
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.statuses.append(status)
+            if chunked:
+                self.server.chunked += 1
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(body), 5):
+                piece = body[i:i + 5]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        if url.path == "/api/get":
+            title = query.get("track_name", "")
+            if title.startswith("missing"):
+                return self.reply(404)
+            if title.startswith("busy"):
+                with self.server.lock:
+                    first = title not in self.server.busy_seen
+                    self.server.busy_seen.add(title)
+                if first:
+                    return self.reply(429, headers={"Retry-After": "0"})
+            body = json.dumps({"syncedLyrics": f"[00:01.00]{title}", "duration": 0}).encode()
+            # Every other track comes back chunked
+            return self.reply(200, body, {"Content-Type": "application/json"},
+                              chunked=title.endswith(("0", "2", "4", "6", "8")))
+        if url.path == "/search":
+            term = query.get("term", "")
+            artwork = f"{self.server.base}/art/{urllib.parse.quote(term)}/100x100bb.jpg"
+            body = json.dumps({"resultCount": 1, "results": [{"artworkUrl100": artwork}]}).encode()
+            return self.reply(200, body, {"Content-Type": "application/json"})
+        if url.path.startswith("/art/"):
+            return self.reply(200, b"JPEG" + url.path.encode(), chunked=True)
+        self.reply(404)
+
+class FakeAudio:
+    # Stands in for AudioHandler so the test needs no audio files
+    def __init__(self):
+        self.lyrics = {}
+        self.covers = {}
+
+    def get_tags(self, path):
+        return {"path": path, "artist": "Artist", "title": os.path.basename(path), "album": "Album", "duration": 0}
+
+    def save_tags(self, path, tags):
+        self.lyrics[path] = tags["lyrics"]
+        return "saved"
+
+    def set_cover(self, path, data):
+        self.covers[path] = data
+        return True
+
+class Record:
+    def __init__(self, path, album):
+        self.path = path
+        self.artist = self.albumartist = "Artist"
+        self.album = album
+
+def test_async_fetch():
+    print("Testing async fetch engine against a fake lrclib...")
+
+    # Replace (never mutate) the touched sections, so they can be put back afterwards
+    config = ConfigManager()
+    touched = ("async_fetch", "http_cache")
+    saved_config = {section: config.config.get(section) for section in touched}
+    config.config["async_fetch"] = dict(saved_config["async_fetch"] or {}, enabled=True)
+    # No cache file in the checkout if the client is first created here
+    config.config["http_cache"] = dict(saved_config["http_cache"] or {}, enabled=False)
+
+    server = FakeServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Fresh cache, and no rate limit against the local server
+    client = get_client()
+    saved = client.cache, client.limiter.enabled
+    tmp = tempfile.mkdtemp()
+    try:
+        client.cache = ResponseCache(os.path.join(tmp, "http_cache.db"))
+        client.limiter.enabled = False
+
+        # 1. Mass lyrics
+        proc = BatchLyricsProcessor()
+        proc.lrc_url = f"{server.base}/api"
+        proc.audio_handler = FakeAudio()
+        files = [f"/music/track{i}" for i in range(40)]
+        files += [f"/music/missing{i}" for i in range(5)] + [f"/music/busy{i}" for i in range(3)]
+
+        results = {}
+        proc.process_library(files, lambda done, total, f, status: results.__setitem__(f, status),
+                             save_sidecar=False)
+        print(f"Lyrics: {len(results)} results over {server.connections} connections, "
+              f"{server.requests} requests, {server.chunked} chunked")
+
+        assert len(results) == len(files)
+        assert all(results[f] == "Success" for f in files if "/track" in f or "/busy" in f)
+        assert all(results[f] == "Not Found" for f in files if "/missing" in f)
+        assert proc.audio_handler.lyrics["/music/track3"] == "[00:01.00]track3"
+        assert proc.audio_handler.lyrics["/music/track4"] == "[00:01.00]track4" # Chunked body
+        assert server.statuses.count(429) == 3 # Each busy track was retried once
+        assert server.statuses.count(404) == 5
+        assert server.chunked > 0
+        assert server.connections < server.requests # Keep-alive connections were reused
+
+        # 2. Album covers: one search and one download per album
+        metadata = MetadataHandler()
+        metadata.itunes_url = server.base
+        audio = FakeAudio()
+        records = [Record(f"/music/album{a}/{t}.mp3", f"Album {a}") for a in range(6) for t in range(4)]
+        before = server.requests
+        modified, found, albums = AlbumCoverPipeline(audio, metadata).run(records)
+        print(f"Covers: {found}/{albums} albums, {len(modified)} files, {server.requests - before} requests")
+
+        assert (found, albums) == (6, 6)
+        assert len(modified) == len(records)
+        assert server.requests - before == 12
+        assert audio.covers["/music/album2/3.mp3"].startswith(b"JPEG/art/")
+    finally:
+        client.cache, client.limiter.enabled = saved
+        for section, value in saved_config.items():
+            if value is None:
+                config.config.pop(section, None)
+            else:
+                config.config[section] = value
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print("PASS: Async fetch engine works against the fake server.")
+
+if __name__ == "__main__":
+    test_async_fetch()